@@ -8,10 +8,22 @@ This script packages the COMSOL automation skill for distribution.
 """
 
 import os
-import shutil
 import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Already-compressed members are stored as-is; deflating them only costs CPU
+STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gz', '.zip', '.mph'}
+
+def _read_member(path, arcname):
+    """
+    Read a skill file together with its archive metadata
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    with open(path, 'rb') as f:
+        return zinfo, f.read()
+
 def create_skill_package(skill_dir, output_dir):
     """
     Create a packaged skill from the skill directory
@@ -20,59 +32,43 @@ def create_skill_package(skill_dir, output_dir):
     package_name = f"{skill_name}.skill"
     package_path = os.path.join(output_dir, package_name)
     
-    # Create temporary directory for packaging
-    temp_dir = f"/tmp/{skill_name}_package"
-    os.makedirs(temp_dir, exist_ok=True)
+    # Create package metadata
+    metadata = {
+        "name": skill_name,
+        "version": "1.0.0",
+        "description": "COMSOL Multiphysics automation solution for end-to-end simulation workflows",
+        "created": datetime.now().isoformat(),
+        "author": "Zhou Tianhang, China University of Petroleum (Beijing)",
+        "contact": "zhouth@cup.edu.cn",
+        "dependencies": [
+            "mph>=1.0.0",
+            "numpy",
+            "pandas",
+            "scipy"
+        ]
+    }
     
-    try:
-        # Copy all skill files
-        for item in os.listdir(skill_dir):
-            source = os.path.join(skill_dir, item)
-            dest = os.path.join(temp_dir, item)
-            if os.path.isdir(source):
-                shutil.copytree(source, dest)
-            else:
-                shutil.copy2(source, dest)
-        
-        # Create package metadata
-        metadata = {
-            "name": skill_name,
-            "version": "1.0.0",
-            "description": "COMSOL Multiphysics automation solution for end-to-end simulation workflows",
-            "created": datetime.now().isoformat(),
-            "author": "Zhou Tianhang, China University of Petroleum (Beijing)",
-            "contact": "zhouth@cup.edu.cn",
-            "dependencies": [
-                "mph>=1.0.0",
-                "numpy",
-                "pandas",
-                "scipy"
-            ]
-        }
-        
-        with open(os.path.join(temp_dir, "skill.json"), "w") as f:
-            json.dump(metadata, f, indent=2)
-        
-        # Create final package
-        shutil.make_archive(
-            os.path.join(output_dir, skill_name),
-            'zip',
-            temp_dir
-        )
-        
-        # Rename to .skill extension
-        os.rename(
-            os.path.join(output_dir, f"{skill_name}.zip"),
-            package_path
-        )
-        
-        print(f"Skill package created: {package_path}")
-        return package_path
+    # Collect (source, archive name) pairs for every skill file
+    members = []
+    for root, dirs, files in os.walk(skill_dir, followlinks=False):
+        for file in files:
+            path = os.path.join(root, file)
+            members.append((path, os.path.relpath(path, skill_dir)))
+    
+    # Stream skill files straight into the archive (no temporary copy);
+    # file reads overlap in worker threads, archive writes stay in order
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with zipfile.ZipFile(package_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=3) as zf, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for zinfo, data in executor.map(lambda m: _read_member(*m), members):
+            ext = os.path.splitext(zinfo.filename)[1].lower()
+            compress = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            zf.writestr(zinfo, data, compress_type=compress, compresslevel=3)
         
-    finally:
-        # Cleanup
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+        zf.writestr("skill.json", json.dumps(metadata, indent=2).encode('utf-8'))
+    
+    print(f"Skill package created: {package_path}")
+    return package_path
 
 def main():
     """
@@ -8,26 +8,112 @@ import os
 import sys
 import json
 import logging
-import random
+import queue
+import string
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from typing import List, Dict, Any, Tuple
-from itertools import product
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+MESH_PARAMETER_FIELDS = (
+    "interior_mesh_size",
+    "stream_width_mesh_size",
+    "stream_width_cells",
+    "stream_depth_mesh_size",
+    "stream_depth_cells",
+)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_file(path: str, data: bytes) -> int:
+    """Write bytes to a file with raw os-level calls and return the number of bytes written"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        written = 0
+        view = memoryview(data)
+        while written < len(data):
+            written += os.write(fd, view[written:])
+        return written
+    finally:
+        os.close(fd)
+
+
+def _format_spec(value: float) -> str:
+    """Filename format spec for a parameter value (三位小数 or scientific notation)"""
+    if abs(value) < 1e-2 or abs(value) > 1e6:
+        return '.3e'
+    return '.3f'
+
+
+def _format_param_value(value: float) -> str:
+    """Format a parameter value for filenames (三位小数 or scientific notation)"""
+    return format(value, _format_spec(value))
+
 
 class COMSOLBatchGeneratorDemo:
     """Demo version of batch generator - shows core logic without COMSOL dependency"""
     
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, legacy_json: bool = False):
         self.config = self._load_config(config_file)
+        self._param_names = list(self.config.get('parameters', {}).keys())
+        self._param_values = list(self.config.get('parameters', {}).values())
+        self._units = self.config.get('parameter_units', {})
+        self._template_model = self.config.get('template_model', 'unknown')
+        self._output_dir = self.config.get('output_directory')
+        # Filename format fixed once per parameter when all its configured values share one;
+        # parameters whose values need different formats keep the per-value choice
+        self._fmt_spec = {}
+        for name, values in zip(self._param_names, self._param_values):
+            specs = {_format_spec(v) for v in values}
+            if len(specs) == 1:
+                self._fmt_spec[name] = specs.pop()
         self.setup_logging()
         self.generated_files = []
+        self.generated_metadata = []
+        # Per-model JSON sidecars only when requested (or when no Parquet writer is available)
+        self._legacy_json = legacy_json or pd is None or pa is None
+        self._results_lock = threading.Lock()
+        self.combination_array = None
+        self._fmt_filename = self._compile_filename_formatter()
+        self._filename_extension = self.config.get('file_naming', {}).get('extension', '.mph')
         
     def _load_config(self, config_file: str) -> Dict[str, Any]:
         """Load configuration from JSON file"""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = _json_loads(Path(config_file).read_bytes())
             return config
         except Exception as e:
             print(f"Error loading config file: {e}")
@@ -38,19 +124,46 @@ class COMSOLBatchGeneratorDemo:
         log_level = self.config.get('execution_settings', {}).get('log_level', 'INFO')
         level = getattr(logging, log_level)
         
-        logging.basicConfig(
-            level=level,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler("comsol_demo_batch.log", encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # Handlers run on a listener thread so worker threads only enqueue records
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler("comsol_demo_batch.log", encoding='utf-8')
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+            
+        # Log file writes are batched; WARNING and above flush immediately
+        self._log_buffer = MemoryHandler(1024, flushLevel=logging.WARNING, target=file_handler)
+        
+        log_queue = queue.Queue(-1)
+        self._log_listener = QueueListener(log_queue, self._log_buffer, stream_handler)
+        self._log_listener.start()
+        
+        # Queue side keeps the bare message; the listener handlers add the prefix.
+        # Added directly, since basicConfig is a no-op once the root logger has handlers
+        self._queue_handler = QueueHandler(log_queue)
+        self._queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        root = logging.getLogger()
+        root.addHandler(self._queue_handler)
+        root.setLevel(level)
         self.logger = logging.getLogger(__name__)
         
+    def stop_logging(self):
+        """Flush queued log records and stop the logging listener thread"""
+        if self._log_listener is not None:
+            # Detach first so later records don't pile up in a queue nobody drains
+            logging.getLogger().removeHandler(self._queue_handler)
+            file_handler = self._log_buffer.target
+            try:
+                self._log_listener.stop()
+            finally:
+                self._log_listener = None
+                # Closing the buffer flushes whatever is below WARNING into the log file first
+                self._log_buffer.close()
+                file_handler.close()
+        
     def create_output_directory(self):
         """Create output directory"""
-        output_dir = self.config['output_directory']
+        output_dir = self._output_dir
         try:
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir, exist_ok=True)
@@ -64,81 +177,113 @@ class COMSOLBatchGeneratorDemo:
         """Generate all parameter combinations with filtering (same as your original script)"""
         self.logger.info("=== Generating Parameter Combinations ===")
         
-        parameters = self.config['parameters']
-        param_names = list(parameters.keys())
-        param_values = list(parameters.values())
+        param_names = self._param_names
+        param_values = self._param_values
         
-        # Generate all possible combinations (笛卡尔积)
-        all_combinations = []
-        for values in product(*param_values):
-            combination = dict(zip(param_names, values))
-            all_combinations.append(combination)
+        # Generate all possible combinations (笛卡尔积) as per-parameter value indices (d, N)
+        # and the matching float (N, d) array used for filtering and mesh sizes
+        grid_index = np.indices(tuple(len(v) for v in param_values)).reshape(len(param_values), -1)
+        all_combinations = np.stack([np.asarray(v, dtype=np.float64)[i]
+                                     for v, i in zip(param_values, grid_index)], axis=1)
             
-        self.logger.info(f"Total theoretical combinations: {len(all_combinations)}")
+        self.logger.info(f"Total theoretical combinations: {all_combinations.shape[0]}")
         
         # Apply filtering logic from your script (K_ch > 2.4 and W_ch > 2.4 and W_rib > 9)
-        parameter_combinations = []
-        for combo in all_combinations:
-            if combo["K_ch"] > 2.4 and combo["W_ch"] > 2.4 and combo["W_rib"] > 9:
-                # 50% probability to skip (matching random.random() < 0.5 in your script)
-                if random.random() < 0.5:
-                    continue
-            parameter_combinations.append(combo)
+        # 50% probability to skip (matching random.random() < 0.5 in your script)
+        i_K_ch = param_names.index("K_ch")
+        i_W_ch = param_names.index("W_ch")
+        i_W_rib = param_names.index("W_rib")
+        # Coin flips are drawn as one vector; batch_filtering.seed (default 0, as in the
+        # batch generator) makes the selection reproducible
+        rng = np.random.default_rng(self.config.get('batch_filtering', {}).get('seed', 0))
+        drop = ((all_combinations[:, i_K_ch] > 2.4)
+                & (all_combinations[:, i_W_ch] > 2.4)
+                & (all_combinations[:, i_W_rib] > 9)
+                & (rng.random(all_combinations.shape[0]) < 0.5))
+        kept = np.flatnonzero(~drop)
         
         # Limit to target count (868 in your case)
         target_count = self.config.get('batch_filtering', {}).get('target_count', 868)
-        if len(parameter_combinations) > target_count:
-            random.shuffle(parameter_combinations)
-            parameter_combinations = parameter_combinations[:target_count]
+        if kept.shape[0] > target_count:
+            kept = kept[rng.choice(kept.shape[0], size=target_count, replace=False)]
+        
+        self.combination_array = all_combinations[kept]
+        # Dicts take the configured values themselves, so integer parameters stay integers
+        parameter_combinations = [
+            {name: values[i] for name, values, i in zip(param_names, param_values, row)}
+            for row in grid_index[:, kept].T.tolist()
+        ]
         
         final_count = len(parameter_combinations)
         self.logger.info(f"Filtered to {final_count} combinations for processing")
         
         return parameter_combinations
         
-    def calculate_mesh_parameters(self, geom_params: Dict[str, float]) -> Dict[str, float]:
-        """Calculate mesh parameters (same logic as your script)"""
-        mesh_config = self.config.get('mesh_settings', {})
-        mesh_params = {}
+    def calculate_mesh_parameters_bulk(self, combinations: np.ndarray, columns: List[str]) -> np.ndarray:
+        """Calculate mesh parameters for every combination row at once (columns follow MESH_PARAMETER_FIELDS)"""
+        K_ch = combinations[:, columns.index("K_ch")]
+        W_ch = combinations[:, columns.index("W_ch")]
         
         # Calculate interior mesh size (K_ch/5 as in your script)
-        K_ch = geom_params["K_ch"]
         interior_mesh_size = K_ch / 5
-        mesh_params["interior_mesh_size"] = interior_mesh_size
         
         # Calculate actual cell counts and mesh sizes
-        stream_width_cells = K_ch / interior_mesh_size
-        actual_stream_width_cells = max(1, round(stream_width_cells))
-        stream_width_mesh_size = K_ch / actual_stream_width_cells
-        mesh_params["stream_width_mesh_size"] = stream_width_mesh_size
-        mesh_params["stream_width_cells"] = actual_stream_width_cells
-        
-        W_ch = geom_params["W_ch"]
-        stream_depth_cells = W_ch / interior_mesh_size
-        actual_stream_depth_cells = max(1, round(stream_depth_cells))
-        stream_depth_mesh_size = W_ch / actual_stream_depth_cells
-        mesh_params["stream_depth_mesh_size"] = stream_depth_mesh_size
-        mesh_params["stream_depth_cells"] = actual_stream_depth_cells
-        
-        self.logger.info(f"Calculated mesh parameters: {mesh_params}")
+        stream_width_cells = np.maximum(1, np.rint(K_ch / interior_mesh_size))
+        stream_depth_cells = np.maximum(1, np.rint(W_ch / interior_mesh_size))
+        
+        return np.stack([
+            interior_mesh_size,
+            K_ch / stream_width_cells,
+            stream_width_cells,
+            W_ch / stream_depth_cells,
+            stream_depth_cells,
+        ], axis=1)
+        
+    def _mesh_row_to_dict(self, row: np.ndarray) -> Dict[str, float]:
+        """Convert one row of calculate_mesh_parameters_bulk output to a mesh parameter dict"""
+        mesh_params = dict(zip(MESH_PARAMETER_FIELDS, row.tolist()))
+        mesh_params["stream_width_cells"] = int(mesh_params["stream_width_cells"])
+        mesh_params["stream_depth_cells"] = int(mesh_params["stream_depth_cells"])
         return mesh_params
         
-    def generate_filename(self, param_values: Dict[str, float]) -> str:
-        """Generate filename following your naming convention"""
+    def calculate_mesh_parameters(self, geom_params: Dict[str, float]) -> Dict[str, float]:
+        """Calculate mesh parameters (same logic as your script)"""
+        columns = list(geom_params.keys())
+        row = np.array([list(geom_params.values())], dtype=np.float64)
+        mesh_params = self._mesh_row_to_dict(self.calculate_mesh_parameters_bulk(row, columns)[0])
+        
+        self.logger.debug(f"Calculated mesh parameters: {mesh_params}")
+        return mesh_params
+        
+    def _compile_filename_formatter(self):
+        """Compile the file_naming format string into a specialized formatter function"""
         naming_config = self.config.get('file_naming', {})
         format_str = naming_config.get('format', 'batch_model_Kch_{K_ch}_Wch_{W_ch}_Wrib_{W_rib}')
-        extension = naming_config.get('extension', '.mph')
         
-        # Format values to match your script (三位小数 or scientific notation)
-        formatted_params = {}
-        for key, value in param_values.items():
-            if abs(value) < 1e-2 or abs(value) > 1e6:
-                formatted_params[key] = f"{value:.3e}"
+        # Parse the template once and emit a concatenation of literals and formatted fields
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(format_str):
+            if literal:
+                parts.append(repr(literal))
+            if field is None:
+                continue
+            if conversion or not field.isidentifier():
+                # Attribute/index lookups and conversions keep the generic str.format path
+                return lambda d: format_str.format(**{k: _format_param_value(v) for k, v in d.items()})
+            if field in self._fmt_spec:
+                value_expr = f"format(d[{field!r}], {self._fmt_spec[field]!r})"
             else:
-                formatted_params[key] = f"{value:.3f}"
+                value_expr = f"_format_param_value(d[{field!r}])"
+            parts.append(f"format({value_expr}, {spec!r})" if spec else value_expr)
+            
+        namespace = {"_format_param_value": _format_param_value}
+        exec(f"def _fmt_filename(d):\n    return {' + '.join(parts) or repr('')}\n", namespace)
+        return namespace["_fmt_filename"]
         
-        filename = format_str.format(**formatted_params)
-        filename += extension
+    def generate_filename(self, param_values: Dict[str, float]) -> str:
+        """Generate filename following your naming convention"""
+        filename = self._fmt_filename(param_values)
+        filename += self._filename_extension
         
         # Replace scientific notation e+ with e
         filename = filename.replace("e+", "e")
@@ -151,59 +296,88 @@ class COMSOLBatchGeneratorDemo:
             "model_parameters": param_values,
             "mesh_parameters": mesh_params,
             "generation_timestamp": "2026-01-19T15:30:00Z",
-            "template_source": self.config.get('template_model', 'unknown'),
+            "template_source": self._template_model,
             "generation_script": "comsol_skill_batch_generator",
             "version": "1.0",
         }
         return metadata
         
-    def process_single_combination(self, param_values: Dict[str, float], idx: int, total: int) -> bool:
+    def _flatten_metadata(self, output_path: str, file_size: int, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten model metadata into one table row (mesh fields get a mesh_ prefix)"""
+        row = {
+            "filename": os.path.basename(output_path),
+            "relative_path": os.path.relpath(output_path, self._output_dir),
+            "size_bytes": file_size,
+        }
+        row.update(metadata["model_parameters"])
+        row.update({f"mesh_{key}": value for key, value in metadata["mesh_parameters"].items()})
+        row.update({key: value for key, value in metadata.items() if not isinstance(value, dict)})
+        return row
+        
+    def write_metadata_table(self):
+        """Write the collected model metadata as a single Parquet file"""
+        metadata_file = os.path.join(self._output_dir, "metadata.parquet")
+        pd.DataFrame(self.generated_metadata).to_parquet(metadata_file, compression='zstd', index=False)
+        self.logger.info(f"Model metadata saved to: {metadata_file}")
+        
+    def process_single_combination(self, param_values: Dict[str, float], idx: int, total: int,
+                                   mesh_row: np.ndarray = None) -> bool:
         """Process a single parameter combination (demo version)"""
-        self.logger.info(f"Processing combination {idx}/{total}: {param_values}")
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(f"Processing combination {idx}/{total}: {param_values}")
         
         try:
-            # Simulate loading template (logging only)
-            self.logger.info(f"Loading template: {self.config['template_model']}")
-            
-            # Set up parameters with units (same as your script)
-            units = self.config.get('parameter_units', {})
-            for param_name, param_value in param_values.items():
-                unit = units.get(param_name, "")
-                # Format like your script: f"{param_value:.2f}[{unit}]"
-                formatted_value = f"{param_value:.2f}[{unit}]"
-                self.logger.info(f"  Parameter {param_name}: {formatted_value}")
+            if debug:
+                # Simulate loading template (logging only)
+                self.logger.debug(f"Loading template: {self._template_model}")
+                
+                # Set up parameters with units (same as your script)
+                for param_name, param_value in param_values.items():
+                    unit = self._units.get(param_name, "")
+                    # Format like your script: f"{param_value:.2f}[{unit}]"
+                    formatted_value = f"{param_value:.2f}[{unit}]"
+                    self.logger.debug(f"  Parameter {param_name}: {formatted_value}")
             
-            # Calculate mesh parameters
-            mesh_params = self.calculate_mesh_parameters(param_values)
+            # Calculate mesh parameters (precomputed in bulk when available)
+            if mesh_row is not None:
+                mesh_params = self._mesh_row_to_dict(mesh_row)
+            else:
+                mesh_params = self.calculate_mesh_parameters(param_values)
             
             # Simulate mesh generation
-            self.logger.info("Generating mesh...")
-            self.logger.info(f"  Stream interior mesh: {mesh_params['interior_mesh_size']:.4f}")
-            self.logger.info(f"  Width cells: {mesh_params['stream_width_cells']}")
-            self.logger.info(f"  Depth cells: {mesh_params['stream_depth_cells']}")
+            if debug:
+                self.logger.debug(f"Calculated mesh parameters: {mesh_params}")
+                self.logger.debug("Generating mesh...")
+                self.logger.debug(f"  Stream interior mesh: {mesh_params['interior_mesh_size']:.4f}")
+                self.logger.debug(f"  Width cells: {mesh_params['stream_width_cells']}")
+                self.logger.debug(f"  Depth cells: {mesh_params['stream_depth_cells']}")
             
             # Generate filename
             filename = self.generate_filename(param_values)
-            output_path = os.path.join(self.config['output_directory'], filename)
+            output_path = os.path.join(self._output_dir, filename)
             
-            # Save metadata file instead of actual COMSOL model
+            # Save metadata instead of actual COMSOL model (collected into metadata.parquet by default)
             metadata = self.create_model_metadata(param_values, mesh_params)
-            metadata_file = output_path.replace('.mph', '_metadata.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            if self._legacy_json:
+                metadata_file = output_path.replace('.mph', '_metadata.json')
+                _write_file(metadata_file, _json_dumps(metadata))
             
             # Create placeholder .mph file
-            with open(output_path, 'w') as f:
-                f.write(f"# COMSOL Model File (Demo)")
-                f.write(f"# Generated by COMSOL Automation Skill")
-                f.write(f"# Parameters: {param_values}")
-                f.write(f"# Mesh params: {mesh_params}")
+            file_size = _write_file(output_path, (
+                f"# COMSOL Model File (Demo)\n"
+                f"# Generated by COMSOL Automation Skill\n"
+                f"# Parameters: {param_values}\n"
+                f"# Mesh params: {mesh_params}\n"
+            ).encode('utf-8'))
             
-            # Verify output
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                self.logger.info(f"Generated model: {output_path} ({file_size} bytes)")
-                self.generated_files.append(output_path)
+            # Verify output (size reported by the write, no extra stat)
+            if file_size > 0:
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Generated model {idx}/{total}: {output_path} ({file_size} bytes)")
+                with self._results_lock:
+                    self.generated_files.append((output_path, file_size))
+                    self.generated_metadata.append(self._flatten_metadata(output_path, file_size, metadata))
                 return True
             else:
                 self.logger.error(f"Failed to create output file: {output_path}")
@@ -211,7 +385,8 @@ class COMSOLBatchGeneratorDemo:
                 
         except Exception as e:
             self.logger.error(f"Failed to process combination {idx}: {e}")
-            self.logger.error(traceback.format_exc())
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(traceback.format_exc())
             return False
             
     def run_batch_generation(self):
@@ -229,23 +404,35 @@ class COMSOLBatchGeneratorDemo:
             # Generate parameter combinations
             combinations = self.generate_parameter_combinations()
             
-            # Process each combination
+            # Calculate mesh parameters for all combinations at once
+            mesh_table = self.calculate_mesh_parameters_bulk(
+                self.combination_array, self._param_names)
+            
+            # Process combinations concurrently (file writes are I/O bound)
             success_count = 0
             error_count = 0
+            total = len(combinations)
+            max_workers = self.config.get('execution_settings', {}).get(
+                'parallel_workers', min(32, (os.cpu_count() or 4) * 4))
             
-            for idx, param_values in enumerate(combinations, 1):
-                success = self.process_single_combination(param_values, idx, len(combinations))
-                if success:
-                    success_count += 1
-                else:
-                    error_count += 1
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(self.process_single_combination,
+                                       combinations, range(1, total + 1), repeat(total), mesh_table)
+                for idx, success in enumerate(results, 1):
+                    if success:
+                        success_count += 1
+                    else:
+                        error_count += 1
+                        
+                    # Progress reporting
+                    if idx % 100 == 0 or idx == total:
+                        self.logger.info(f"Progress: {idx}/{total} ({success_count} successful, {error_count} errors)")
                     
-                # Progress reporting
-                if idx % 100 == 0 or idx == len(combinations):
-                    self.logger.info(f"Progress: {idx}/{len(combinations)} ({success_count} successful, {error_count} errors)")
-                    
-            # Create summary report
-            self.create_summary_report(success_count, error_count, len(combinations))
+            # Write collected metadata and summary report
+            if not self._legacy_json:
+                self.write_metadata_table()
+            self.create_summary_report(success_count, error_count, total)
+            self.stop_logging()
             
             # Final results
             print("\n" + "="*60)
@@ -258,7 +445,7 @@ class COMSOLBatchGeneratorDemo:
             print(f"📝 Log file: comsol_demo_batch.log")
             print()
             print("📋 Files generated:")
-            for i, filepath in enumerate(self.generated_files[:5], 1):
+            for i, (filepath, _) in enumerate(self.generated_files[:5], 1):
                 filename = os.path.basename(filepath)
                 print(f"   {i}. {filename}")
             if len(self.generated_files) > 5:
@@ -277,8 +464,12 @@ class COMSOLBatchGeneratorDemo:
             self.logger.error(traceback.format_exc())
             return False
             
+        finally:
+            self.stop_logging()
+            
     def create_summary_report(self, success_count: int, error_count: int, total: int):
         """Create a summary report of the generation process"""
+        output_dir = self._output_dir
         report = {
             "generation_summary": {
                 "timestamp": "2026-01-19T15:30:00Z",
@@ -288,19 +479,24 @@ class COMSOLBatchGeneratorDemo:
                 "success_rate": f"{(success_count/total)*100:.1f}%" if total > 0 else "0%"
             },
             "configuration": self.config,
-            "generated_files": [
+        }
+        
+        if not self._legacy_json:
+            # The per-file table (paths, sizes, parameters) is already in metadata.parquet
+            report["generated_files_table"] = "metadata.parquet"
+        else:
+            report["generated_files"] = [
                 {
                     "filename": os.path.basename(f),
-                    "relative_path": os.path.relpath(f, self.config['output_directory']),
-                    "size_bytes": os.path.getsize(f) if os.path.exists(f) else 0
+                    "relative_path": os.path.relpath(f, output_dir),
+                    "size_bytes": size,
                 }
-                for f in self.generated_files
+                for f, size in self.generated_files
             ]
-        }
         
-        report_file = os.path.join(self.config['output_directory'], "generation_summary.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        report_file = os.path.join(output_dir, "generation_summary.json")
+        with open(report_file, 'wb') as f:
+            f.write(_json_dumps(report))
         
         self.logger.info(f"Summary report saved to: {report_file}")
 
@@ -311,9 +507,15 @@ def main():
     print("This demo shows the workflow without requiring COMSOL installation")
     print()
     
-    if len(sys.argv) != 2:
-        print("Usage: python3 batch_demo.py <config_file.json>")
+    args = sys.argv[1:]
+    legacy_json = '--legacy-json' in args
+    if legacy_json:
+        args.remove('--legacy-json')
+        
+    if len(args) != 1:
+        print("Usage: python3 batch_demo.py <config_file.json> [--legacy-json]")
         print("Example: python3 batch_demo.py test_batch_config.json")
+        print("  --legacy-json: write a _metadata.json file per model instead of metadata.parquet")
         print()
         print("This will demonstrate:")
         print("✓ Parameter combination generation")
@@ -323,10 +525,10 @@ def main():
         print("✓ Batch processing workflow")
         sys.exit(1)
         
-    config_file = sys.argv[1]
+    config_file = args[0]
     
     # Initialize and run batch generator demo
-    demo = COMSOLBatchGeneratorDemo(config_file)
+    demo = COMSOLBatchGeneratorDemo(config_file, legacy_json=legacy_json)
     success = demo.run_batch_generation()
     
     if not success:
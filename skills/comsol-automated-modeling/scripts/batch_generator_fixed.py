@@ -9,12 +9,23 @@ import os
 import sys
 import json
 import logging
-import random
-import traceback
+import multiprocessing.util
+import queue
+import shutil
+import tempfile
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from typing import List, Dict, Any, Tuple
-from itertools import product
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     import mph
 except ImportError:
@@ -25,20 +36,90 @@ except ImportError:
     sys.exit(1)
 
 
+# Number of grid points evaluated at a time when streaming the Cartesian product
+COMBINATION_CHUNK_SIZE = 1 << 16
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer applied element-wise to a uint64 array"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _hash_columns(columns, seed: int = 0) -> np.ndarray:
+    """Deterministic per-row 64-bit hash of numeric columns"""
+    h = np.full(len(columns[0]), seed & 0xFFFFFFFFFFFFFFFF, dtype=np.uint64)
+    for column in columns:
+        # Hash the float64 bit pattern so 3 and 3.0 hash alike
+        h = _mix64(h ^ np.asarray(column, dtype=np.float64).view(np.uint64))
+    return h
+
+
+# Per-process generator used by pool workers (one COMSOL client per process)
+_worker_generator = None
+
+
+def _init_worker(config: Dict[str, Any], cores: int):
+    """Pool initializer: start one COMSOL client for this worker process"""
+    global _worker_generator
+    # Forked workers inherit the parent's root handlers, whose queue nothing in this process drains
+    logging.basicConfig(handlers=[], force=True)
+    _worker_generator = COMSOLBatchGenerator(config=config)
+    # Worker processes exit without running atexit hooks; remove the scratch directory
+    # and flush buffered logs on shutdown (higher priority runs first)
+    multiprocessing.util.Finalize(None, _worker_generator.cleanup_scratch, exitpriority=20)
+    multiprocessing.util.Finalize(None, _worker_generator.stop_logging, exitpriority=10)
+    _worker_generator.client = mph.start(cores=cores)
+    
+    
+def _process_combination_in_worker(param_values: Dict[str, float], idx: int, total: int) -> bool:
+    """Process one combination with this worker's COMSOL client"""
+    success = _worker_generator.process_single_combination(param_values, idx, total)
+    # The parent only sees this return value, so a worker finishes its move before reporting;
+    # the other workers keep their COMSOL instances busy in the meantime
+    return _worker_generator.finish_pending_moves() == 0 and success
+
+
+def _move_output(scratch_path: str, output_path: str):
+    """Move a saved model from scratch to the output directory, dropping the scratch copy on failure"""
+    try:
+        # shutil.move renames on the same filesystem and copies across filesystems
+        shutil.move(scratch_path, output_path)
+    finally:
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+
+
 class COMSOLBatchGenerator:
     """Batch generator for COMSOL models with parameter sweeps"""
     
-    def __init__(self, config_file: str):
-        self.config = self._load_config(config_file)
+    def __init__(self, config_file: str = None, config: Dict[str, Any] = None):
+        self.config = config if config is not None else self._load_config(config_file)
         self.client = None
+        self.template_model = None
+        # Configured parameters present in the template, in config order (set on template load)
+        self._param_order = None
+        self._mesh_ops = self._parse_mesh_settings()
+        # Grid values repeat across combinations, so formatted strings are memoized per instance
+        self._units = self.config.get('parameter_units', {})
+        self._format_param = lru_cache(maxsize=4096)(self._format_param_value)
+        # Saved outputs awaiting the end-of-run verification sweep
+        self._saved_outputs = []
+        # Local scratch directory and background mover, created on first save when
+        # use_local_scratch is set; pending moves are (output_path, future) pairs
+        self._scratch = None
+        self._move_pool = None
+        self._pending_moves = []
         self.setup_logging()
         
     def _load_config(self, config_file: str) -> Dict[str, Any]:
         """Load configuration from JSON file"""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
+            data = Path(config_file).read_bytes()
+            # orjson parses bytes directly; fall back to the stdlib parser
+            return orjson.loads(data) if orjson is not None else json.loads(data)
         except Exception as e:
             print(f"Error loading config file: {e}")
             sys.exit(1)
@@ -47,24 +128,52 @@ class COMSOLBatchGenerator:
         """Setup logging configuration"""
         log_level = getattr(logging, self.config.get('execution_settings', {}).get('log_level', 'INFO'))
         
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler("comsol_skill_batch.log", encoding='utf-8'),
-                logging.StreamHandler()
-            ],
-            encoding='utf-8'
-        )
+        # Handlers run on a listener thread so the generation loop only enqueues records
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler("comsol_skill_batch.log", encoding='utf-8')
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+            
+        # Log file writes are batched; WARNING and above flush immediately
+        self._log_buffer = MemoryHandler(1024, flushLevel=logging.WARNING, target=file_handler)
+        
+        log_queue = queue.Queue(-1)
+        self._log_listener = QueueListener(log_queue, self._log_buffer, stream_handler)
+        self._log_listener.start()
+        
+        # Queue side keeps the bare message; the listener handlers add the prefix.
+        # Added alongside any handlers the host application already installed
+        self._queue_handler = QueueHandler(log_queue)
+        self._queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        root = logging.getLogger()
+        root.addHandler(self._queue_handler)
+        root.setLevel(log_level)
         self.logger = logging.getLogger(__name__)
         
+    def stop_logging(self):
+        """Flush queued log records and stop the logging listener thread"""
+        if self._log_listener is not None:
+            # Detach first so later records don't pile up in a queue nobody drains
+            logging.getLogger().removeHandler(self._queue_handler)
+            file_handler = self._log_buffer.target
+            try:
+                self._log_listener.stop()
+            finally:
+                self._log_listener = None
+                # Closing the buffer flushes whatever is below WARNING into the log file first
+                self._log_buffer.close()
+                file_handler.close()
+            
     def create_output_directory(self):
         """Create output directory if it doesn't exist"""
         output_dir = self.config['output_directory']
         try:
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir, exist_ok=True)
-                self.logger.info(f"Created output directory: {output_dir}")
+            # A single mkdir; an existing directory just raises FileExistsError
+            Path(output_dir).mkdir(parents=True)
+            self.logger.info(f"Created output directory: {output_dir}")
+            return True
+        except FileExistsError:
             return True
         except Exception as e:
             self.logger.error(f"Failed to create output directory: {e}")
@@ -76,55 +185,77 @@ class COMSOLBatchGenerator:
         
         parameters = self.config['parameters']
         param_names = list(parameters.keys())
-        param_values = list(parameters.values())
-        
-        # Generate all possible combinations
-        all_combinations = []
-        for values in product(*param_values):
-            combination = dict(zip(param_names, values))
-            all_combinations.append(combination)
+        # Each axis keeps its own dtype so integer parameters stay integers
+        axes = [np.asarray(v) for v in parameters.values()]
+        shape = tuple(len(axis) for axis in axes)
+        total = int(np.prod(shape)) if shape else 0
             
-        self.logger.info(f"Total theoretical combinations: {len(all_combinations)}")
+        self.logger.info(f"Total theoretical combinations: {total}")
         
         # Apply filtering based on configuration
         filtering_config = self.config.get('batch_filtering', {})
         target_count = filtering_config.get('target_count', 868)
+        # Seeding both the exclusion hash and the sampler makes a sweep rerunnable
+        seed = filtering_config.get('seed', 0)
+        rng = np.random.default_rng(seed)
+        
+        # Stream the Cartesian product in chunks of flat grid indices and keep the
+        # target_count rows with the smallest random keys (a uniform sample without
+        # replacement), so memory stays O(target_count + chunk) for any grid size
+        reservoir_index = np.empty(0, dtype=np.int64)
+        reservoir_key = np.empty(0)
+        kept_count = 0
+        excluded_count = 0
         
+        for start in range(0, total, COMBINATION_CHUNK_SIZE):
+            index = np.arange(start, min(start + COMBINATION_CHUNK_SIZE, total))
+            if filtering_config:
+                grid_index = np.unravel_index(index, shape)
+                columns = {name: axis[i] for name, axis, i in zip(param_names, axes, grid_index)}
+                keep = self._apply_filtering(columns, filtering_config, seed)
+                excluded_count += int(len(index) - keep.sum())
+                index = index[keep]
+                
+            kept_count += len(index)
+            reservoir_index = np.concatenate([reservoir_index, index])
+            reservoir_key = np.concatenate([reservoir_key, rng.random(len(index))])
+            if len(reservoir_index) > target_count:
+                smallest = np.argpartition(reservoir_key, target_count)[:target_count]
+                reservoir_index = reservoir_index[smallest]
+                reservoir_key = reservoir_key[smallest]
+                
         if filtering_config:
-            filtered_combinations = self._apply_filtering(all_combinations, filtering_config)
-        else:
-            filtered_combinations = all_combinations
+            self.logger.info(f"Excluded {excluded_count} combinations due to filtering")
             
-        # If we have more than target count, randomly sample
-        if len(filtered_combinations) > target_count:
-            random.shuffle(filtered_combinations)
-            filtered_combinations = filtered_combinations[:target_count]
+        # If we had more than target count, the sample comes out in random order
+        if kept_count > target_count:
+            reservoir_index = reservoir_index[np.argsort(reservoir_key)]
+            
+        # Convert to dicts only for the selected rows
+        grid_index = np.unravel_index(reservoir_index, shape) if shape else ()
+        selected_columns = [axis[i].tolist() for axis, i in zip(axes, grid_index)]
+        filtered_combinations = [dict(zip(param_names, row)) for row in zip(*selected_columns)]
             
         final_count = len(filtered_combinations)
         self.logger.info(f"Filtered to {final_count} combinations ({target_count} target)")
         
         return filtered_combinations
         
-    def _apply_filtering(self, combinations: List[Dict], filtering_config: Dict) -> List[Dict]:
-        """Apply filtering rules to parameter combinations"""
+    def _apply_filtering(self, columns: Dict[str, np.ndarray], filtering_config: Dict,
+                         seed: int = 0) -> np.ndarray:
+        """Apply filtering rules to parameter combinations, returning a boolean keep mask"""
         exclude_condition = filtering_config.get('exclude_condition', {})
         sample_rate = filtering_config.get('sample_rate', 0.5)
         
-        filtered = []
-        excluded_count = 0
+        # Check exclusion conditions (simplified logic matching your script)
+        candidates = (columns["K_ch"] > 2.4) & (columns["W_ch"] > 2.4) & (columns["W_rib"] > 9)
         
-        for combo in combinations:
-            # Check exclusion conditions (simplified logic matching your script)
-            if (combo["K_ch"] > 2.4 and combo["W_ch"] > 2.4 and combo["W_rib"] > 9):
-                # 50% probability to skip (matching your random.random() < 0.5)
-                if random.random() < sample_rate:
-                    excluded_count += 1
-                    continue
-                    
-            filtered.append(combo)
-            
-        self.logger.info(f"Excluded {excluded_count} combinations due to filtering")
-        return filtered
+        # Skip with probability sample_rate, decided by a hash of the combination
+        # so the same sweep always excludes the same rows
+        h = _hash_columns((columns["K_ch"], columns["W_ch"], columns["W_rib"]), seed)
+        excluded = candidates & ((h & np.uint64(0xFFFF)) < np.uint64(int(sample_rate * 0x10000)))
+        
+        return ~excluded
         
     def generate_filename(self, param_values: Dict[str, float]) -> str:
         """Generate systematic filename based on parameters"""
@@ -132,11 +263,8 @@ class COMSOLBatchGenerator:
         format_str = naming_config.get('format', 'batch_model_param1_{param1}_param2_{param2}')
         extension = naming_config.get('extension', '.mph')
         
-        # Replace placeholders in format string
-        filename = format_str.format(**param_values)
-        filename += extension
-        
-        return filename
+        # Replace placeholders in format string (format_map uses the dict without copying it)
+        return format_str.format_map(param_values) + extension
         
     def connect_comsol_server(self):
         """Connect to COMSOL server"""
@@ -157,55 +285,60 @@ class COMSOLBatchGenerator:
             self.logger.error("Make sure COMSOL is installed and running")
             return False
             
-    def calculate_mesh_parameters(self, geom_params: Dict[str, float]) -> Dict[str, float]:
-        """Calculate mesh parameters based on geometry"""
+    def _parse_mesh_settings(self) -> List[Tuple[str, str, float]]:
+        """Parse mesh_settings expressions like "K_ch/5" into (key, parameter, divisor) tuples"""
         mesh_config = self.config.get('mesh_settings', {})
-        mesh_params = {}
+        mesh_ops = []
         
-        # Extract base mesh size from configuration
         for config_key, config_value in mesh_config.items():
             if isinstance(config_value, str) and '/' in config_value:
-                # Parse expressions like "K_ch/5"
                 param_name, divisor = config_value.split('/')
-                if param_name in geom_params:
-                    mesh_params[config_key] = geom_params[param_name] / float(divisor)
+                mesh_ops.append((config_key, param_name, float(divisor)))
+                
+        return mesh_ops
+        
+    def calculate_mesh_parameters(self, geom_params: Dict[str, float]) -> Dict[str, float]:
+        """Calculate mesh parameters based on geometry"""
+        mesh_params = {
+            config_key: geom_params[param_name] / divisor
+            for config_key, param_name, divisor in self._mesh_ops
+            if param_name in geom_params
+        }
                     
         self.logger.info(f"Calculated mesh parameters: {mesh_params}")
         return mesh_params
         
     def setup_parameters_in_model(self, model, param_values: Dict[str, float]):
         """Setup parameters in COMSOL model"""
-        units = self.config.get('parameter_units', {})
-        
-        # List all parameters for debugging
-        all_params = model.parameters()
-        self.logger.info(f"Model has {len(all_params)} parameters: {list(all_params.keys())[:10]}...")
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         
-        for param_name, param_value in param_values.items():
+        # Unknown parameter names were already reported when the template was loaded
+        for param_name in self._param_order:
+            param_value = param_values[param_name]
             try:
-                if param_name not in all_params:
-                    self.logger.warning(f"  Parameter {param_name} not found in model, skipping")
-                    continue
-                    
-                unit = units.get(param_name, "")
-                
                 # Format parameter value with unit (matching your script format)
-                formatted_value = f"{param_value:.2f}[{unit}]"
-                
-                # Get old value
-                old_value = model.parameter(param_name)
+                formatted_value = self._format_param(param_name, param_value)
                 
+                # Reading values back crosses the JVM bridge; only do it for debug output
+                if debug:
+                    old_value = model.parameter(param_name)
+                    
                 # Set new value
                 model.parameter(param_name, formatted_value)
                 
                 # Verify
-                set_value = model.parameter(param_name)
-                self.logger.info(f"  Set {param_name}: {old_value} -> {set_value}")
+                if debug:
+                    set_value = model.parameter(param_name)
+                    self.logger.debug(f"  Set {param_name}: {old_value} -> {set_value}")
                 
             except Exception as e:
                 self.logger.error(f"Failed to set parameter {param_name}: {e}")
                 raise
                 
+    def _format_param_value(self, param_name: str, param_value: float) -> str:
+        """Format a parameter value with its unit for COMSOL"""
+        return f"{param_value:.2f}[{self._units.get(param_name, '')}]"
+        
     def generate_mesh_for_model(self, model, param_values: Dict[str, float], mesh_params: Dict[str, float]) -> bool:
         """Generate mesh for the model"""
         self.logger.info("=== Generating Mesh ===")
@@ -223,6 +356,12 @@ class COMSOLBatchGenerator:
                 
     def verify_mesh_quality(self, model):
         """Verify mesh quality"""
+        # Fetching statistics crosses the JVM bridge; skip it when nobody will see the result
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if not self.config.get('execution_settings', {}).get('mesh_stats', True):
+            return
+            
         try:
             # Get mesh statistics if available
             mesh_stats = model.mesh('mesh1').get()
@@ -232,27 +371,111 @@ class COMSOLBatchGenerator:
             
     def verify_output_file(self, output_path: str, param_values: Dict[str, float]):
         """Verify the generated output file"""
-        if os.path.exists(output_path):
-            file_size = os.path.getsize(output_path)
-            self.logger.info(f"Output file verified: {output_path} ({file_size} bytes)")
-        else:
+        try:
+            file_size = Path(output_path).stat().st_size
+        except FileNotFoundError:
             self.logger.error(f"Output file not found: {output_path}")
+            return
+        self.logger.info(f"Output file verified: {output_path} ({file_size} bytes)")
             
+    def get_output_path(self, param_values: Dict[str, float]) -> str:
+        """Full output path for a parameter combination"""
+        return os.path.join(self.config['output_directory'], self.generate_filename(param_values))
+        
+    def _save_model(self, model, output_path: str):
+        """Save a model, optionally staging it on local scratch and moving it to the output directory in the background"""
+        if not self.config.get('execution_settings', {}).get('use_local_scratch', False):
+            model.save(output_path)
+            return
+            
+        if self._scratch is None:
+            self._scratch = tempfile.mkdtemp(prefix="mph_batch_")
+            self._move_pool = ThreadPoolExecutor(max_workers=2)
+            
+        scratch_path = os.path.join(self._scratch, os.path.basename(output_path))
+        model.save(scratch_path)
+        self._pending_moves.append(
+            (output_path, self._move_pool.submit(_move_output, scratch_path, output_path)))
+        
+    def finish_pending_moves(self) -> int:
+        """Wait for background moves to finish and return how many failed"""
+        failed = set()
+        for output_path, future in self._pending_moves:
+            try:
+                future.result()
+            except Exception as e:
+                failed.add(output_path)
+                self.logger.error(f"Failed to move model to output directory: {output_path}: {e}")
+        self._pending_moves.clear()
+        
+        if failed:
+            # Failed outputs are already counted as errors; nothing to verify for them
+            self._saved_outputs = [item for item in self._saved_outputs if item[0] not in failed]
+        return len(failed)
+        
+    def cleanup_scratch(self):
+        """Wait for outstanding moves and remove the local scratch directory"""
+        self.finish_pending_moves()
+        if self._scratch is not None:
+            self._move_pool.shutdown()
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
+            self._move_pool = None
+            
+    def _record_output(self, param_values: Dict[str, float]):
+        """Remember a saved output for the verification sweep, if enabled"""
+        # model.save() raises on failure, so checking the file is opt-in
+        if self.config.get('post_processing', {}).get('verify_output', False):
+            self._saved_outputs.append((self.get_output_path(param_values), param_values))
+            
+    def verify_output_files(self):
+        """Verify all saved outputs in one sweep at the end of the run"""
+        for output_path, param_values in self._saved_outputs:
+            self.verify_output_file(output_path, param_values)
+        self._saved_outputs.clear()
+        
+    def load_template_model(self):
+        """Load the template model once and return the cached model afterwards"""
+        if self.template_model is None:
+            template_path = self.config['template_model']
+            self.logger.info(f"Loading template: {template_path}")
+            self.template_model = self.client.load(template_path)
+            
+            # Match configured parameters against the template once, not per combination
+            all_params = self.template_model.parameters()
+            self.logger.info(f"Model has {len(all_params)} parameters: {list(all_params.keys())[:10]}...")
+            self._param_order = [name for name in self.config['parameters'] if name in all_params]
+            for name in self.config['parameters']:
+                if name not in all_params:
+                    self.logger.warning(f"  Parameter {name} not found in model, skipping")
+            
+        return self.template_model
+        
+    def _preflight(self, comsol_workers: int) -> bool:
+        """One-time checks before the batch starts"""
+        template_path = self.config['template_model']
+        if not os.path.exists(template_path):
+            self.logger.error(f"Template file not found: {template_path}")
+            return False
+            
+        # Pool workers load their own copy; the serial path loads the shared template up front
+        if comsol_workers <= 1:
+            try:
+                self.load_template_model()
+            except Exception as e:
+                self.logger.error(f"Failed to load template: {e}")
+                return False
+                
+        return True
+        
     def process_single_combination(self, param_values: Dict[str, float], idx: int, total: int) -> bool:
         """Process a single parameter combination"""
         self.logger.info(f"Processing combination {idx}/{total}: {param_values}")
         
-        model = None
         try:
-            # Check if template exists
-            template_path = self.config['template_model']
-            if not os.path.exists(template_path):
-                self.logger.error(f"Template file not found: {template_path}")
-                return False
-                
-            # Load template model
-            self.logger.info(f"Loading template: {template_path}")
-            model = self.client.load(template_path)
+            # Reuse the cached template model; every combination overwrites its
+            # parameters, rebuilds the mesh and saves under its own filename
+            model = self.load_template_model()
             
             # Setup parameters
             self.setup_parameters_in_model(model, param_values)
@@ -270,32 +493,80 @@ class COMSOLBatchGenerator:
                 self.logger.warning("Mesh generation failed, but continuing with model save")
                 
             # Generate filename and save
-            filename = self.generate_filename(param_values)
-            output_path = os.path.join(self.config['output_directory'], filename)
+            output_path = self.get_output_path(param_values)
             
             self.logger.info(f"Saving model: {output_path}")
-            model.save(output_path)
-            
-            # Verify output
-            if self.config.get('post_processing', {}).get('verify_output', True):
-                self.verify_output_file(output_path, param_values)
+            self._save_model(model, output_path)
                 
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to process combination {idx}: {e}")
-            self.logger.error(traceback.format_exc())
+            self._log_failure(f"Failed to process combination {idx}: {e}")
             return False
             
-        finally:
-            # Clean up model
-            if model is not None:
+    def _log_failure(self, message: str):
+        """Log an error; the full traceback is only formatted when debug_tracebacks is set"""
+        if self.config.get('execution_settings', {}).get('debug_tracebacks', False):
+            self.logger.exception(message)
+        else:
+            self.logger.error(message)
+            
+    def _report_progress(self, done: int, total: int, success_count: int, error_count: int):
+        """Log progress every 100 combinations and at the end"""
+        if done % 100 == 0 or done == total:
+            self.logger.info(f"Progress: {done}/{total} ({success_count} successful, {error_count} errors)")
+            
+    def _run_serial(self, combinations: List[Dict[str, float]]) -> Tuple[int, int]:
+        """Process combinations one after another with this process's COMSOL client"""
+        success_count = 0
+        error_count = 0
+        
+        for idx, param_values in enumerate(combinations, 1):
+            success = self.process_single_combination(param_values, idx, len(combinations))
+            if success:
+                success_count += 1
+                self._record_output(param_values)
+            else:
+                error_count += 1
+                
+            self._report_progress(idx, len(combinations), success_count, error_count)
+            
+        return success_count, error_count
+        
+    def _run_parallel(self, combinations: List[Dict[str, float]], workers: int) -> Tuple[int, int]:
+        """Process combinations on a pool of worker processes, each with its own COMSOL client"""
+        # Split the machine's cores between the COMSOL instances instead of oversubscribing;
+        # cores_per_worker overrides the even split (e.g. to leave headroom for other jobs)
+        cores = self.config.get('execution_settings', {}).get(
+            'cores_per_worker', max(1, (os.cpu_count() or 1) // workers))
+        self.logger.info(f"Starting {workers} COMSOL worker processes ({cores} cores each)")
+        
+        success_count = 0
+        error_count = 0
+        total = len(combinations)
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.config, cores)) as executor:
+            futures = {
+                executor.submit(_process_combination_in_worker, param_values, idx, total): param_values
+                for idx, param_values in enumerate(combinations, 1)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
                 try:
-                    self.client.remove(model)
-                    self.logger.info("Model cleaned up")
+                    success = future.result()
                 except Exception as e:
-                    self.logger.warning(f"Failed to clean up model: {e}")
+                    self.logger.error(f"Worker failed: {e}")
+                    success = False
+                if success:
+                    success_count += 1
+                    self._record_output(futures[future])
+                else:
+                    error_count += 1
                     
+                self._report_progress(done, total, success_count, error_count)
+                
+        return success_count, error_count
+        
     def run_batch_generation(self):
         """Run the complete batch generation process"""
         self.logger.info("=== Starting COMSOL Batch Generation ===")
@@ -305,27 +576,29 @@ class COMSOLBatchGenerator:
             if not self.create_output_directory():
                 return False
                 
-            # Connect to COMSOL server
-            if not self.connect_comsol_server():
+            # COMSOL worker processes; parallel_workers is the demo's I/O thread count
+            comsol_workers = self.config.get('execution_settings', {}).get('comsol_workers', 1)
+            
+            # Connect to COMSOL server (pool workers start their own clients)
+            if comsol_workers <= 1 and not self.connect_comsol_server():
+                return False
+                
+            if not self._preflight(comsol_workers):
                 return False
                 
             # Generate parameter combinations
             combinations = self.generate_parameter_combinations()
             
-            # Process each combination
-            success_count = 0
-            error_count = 0
-            
-            for idx, param_values in enumerate(combinations, 1):
-                success = self.process_single_combination(param_values, idx, len(combinations))
-                if success:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    
-                # Progress reporting
-                if idx % 100 == 0 or idx == len(combinations):
-                    self.logger.info(f"Progress: {idx}/{len(combinations)} ({success_count} successful, {error_count} errors)")
+            if comsol_workers > 1:
+                success_count, error_count = self._run_parallel(combinations, comsol_workers)
+            else:
+                success_count, error_count = self._run_serial(combinations)
+                
+            # A saved model only counts once its background move has landed
+            failed_moves = self.finish_pending_moves()
+            success_count -= failed_moves
+            error_count += failed_moves
+            self.verify_output_files()
                     
             # Final summary
             self.logger.info("=== Batch Generation Complete ===")
@@ -339,17 +612,29 @@ class COMSOLBatchGenerator:
             self.logger.info("Batch generation interrupted by user")
             return False
         except Exception as e:
-            self.logger.error(f"Batch generation failed: {e}")
-            self.logger.error(traceback.format_exc())
+            self._log_failure(f"Batch generation failed: {e}")
             return False
         finally:
             # Cleanup
+            self.cleanup_scratch()
+            
+            if self.template_model is not None:
+                try:
+                    self.client.remove(self.template_model)
+                    self.template_model = None
+                    self._param_order = None
+                    self.logger.info("Template model cleaned up")
+                except Exception as e:
+                    self.logger.warning(f"Failed to clean up template model: {e}")
+                    
             if self.client is not None:
                 try:
                     self.client.disconnect()
                     self.logger.info("COMSOL server connection closed")
                 except Exception as e:
                     self.logger.warning(f"Failed to close COMSOL connection: {e}")
+                    
+            self.stop_logging()
 
 
 def main():
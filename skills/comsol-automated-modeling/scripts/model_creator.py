@@ -4,13 +4,115 @@ COMSOL Model Creator
 Handles the creation of COMSOL models through the API
 """
 
+import io
 import json
 import os
 import sys
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 from parameter_handler import COMSOLParameter, ParameterValidator
 
 
+# Java code blocks, keyed by configuration value and filled with str.format_map
+JAVA_GEOMETRY_TEMPLATES = {
+    "rectangle": """\
+        model.component("comp1").geom("geom1").create("blk1", "Block");
+        model.component("comp1").geom("geom1").feature("blk1").set("size", {dims});
+""",
+    "cylinder": """\
+        model.component("comp1").geom("geom1").create("cyl1", "Cylinder");
+        model.component("comp1").geom("geom1").feature("cyl1").set("r", {radius});
+        model.component("comp1").geom("geom1").feature("cyl1").set("h", {height});
+""",
+    "sphere": """\
+        model.component("comp1").geom("geom1").create("sph1", "Sphere");
+        model.component("comp1").geom("geom1").feature("sph1").set("r", {radius});
+""",
+}
+
+JAVA_MESH_TEMPLATES = {
+    "coarse": """\
+        model.component("comp1").mesh("mesh1").automatic(true, "coarse");
+""",
+    "fine": """\
+        model.component("comp1").mesh("mesh1").automatic(true, "fine");
+""",
+    "normal": """\
+        model.component("comp1").mesh("mesh1").automatic(true);
+""",
+}
+
+PHYSICS_TEMPLATES = {
+    "electrostatics": """\
+        model.component("comp1").physics().create("es1", "Electrostatics", "geom1");
+        model.component("comp1").physics("es1").create("pot1", "Pointwise", 2);
+        model.component("comp1").physics("es1").feature("pot1").selection().all();
+""",
+    "heat_transfer": """\
+        model.component("comp1").physics().create("ht1", "HeatTransfer", "geom1");
+        model.component("comp1").physics("ht1").create("init1", "Init", "geom1");
+        model.component("comp1").physics("ht1").feature("init1").selection().all();
+""",
+    "fluid_flow": """\
+        model.component("comp1").physics().create("spf1", "LaminarFlow", "geom1");
+        model.component("comp1").physics("spf1").create("init1", "Init", "geom1");
+        model.component("comp1").physics("spf1").feature("init1").selection().all();
+""",
+    "structural_mechanics": """\
+        model.component("comp1").physics().create("solid1", "SolidMechanics", "geom1");
+        model.component("comp1").physics("solid1").create("fix1", "Fixed", "geom1");
+        model.component("comp1").physics("solid1").feature("fix1").selection().all();
+""",
+}
+
+JAVA_STUDY_TEMPLATES = {
+    "stationary": """\
+        model.study().create("std1");
+        model.study("std1").create("stat", "Stationary");
+""",
+    "time_dependent": """\
+        model.study().create("std1");
+        model.study("std1").create("time", "Time");
+        model.study("std1").feature("time").set("tlist", "range({t_start}, 0.1, {t_end})")
+""",
+    "eigenfrequency": """\
+        model.study().create("std1");
+        model.study("std1").create("eig", "Eigenfrequency");
+""",
+}
+
+JAVA_SOLVER_TEMPLATE = """\
+        // Configure solver
+        model.sol().create("sol1");
+        model.sol("sol1").study("std1");
+        model.sol("sol1").feature("s1").set("rtol", {rel_tol});
+
+"""
+
+# MATLAB code blocks
+MATLAB_GEOMETRY_TEMPLATES = {
+    "rectangle": """\
+model.component.create('comp1', true);
+model.component('comp1').geom.create('geom1', 3);
+model.component('comp1').geom('geom1').create('blk1', 'Block');
+model.component('comp1').geom('geom1').feature('blk1').set('size', [{dims[0]} {dims[1]} {dims[2]}]);
+model.component('comp1').geom('geom1').run;
+""",
+}
+
+MATLAB_PHYSICS_TEMPLATES = {
+    "electrostatics": """\
+model.component('comp1').physics.create('es1', 'Electrostatics', 'geom1');
+""",
+}
+
+MATLAB_STUDY_TEMPLATES = {
+    "stationary": """\
+model.study.create('std1');
+model.study('std1').create('stat', 'Stationary');
+""",
+}
+
+
 class COMSOLModelCreator:
     """Creates COMSOL models using the COMSOL API"""
     
@@ -25,257 +127,184 @@ class COMSOLModelCreator:
     def generate_java_code(self, parameters: Dict[str, COMSOLParameter], 
                           config: Dict[str, Any]) -> str:
         """Generate Java code for COMSOL API"""
-        java_code = []
-        java_code.append("import com.comsol.model.*;")
-        java_code.append("import com.comsol.model.util.*;")
-        java_code.append("")
-        java_code.append(f"public class {config.get('model_name', 'GeneratedModel')} {{")
-        java_code.append("    public static Model run() {")
-        java_code.append("        Model model = ModelUtil.create(\"Model1\");")
-        java_code.append("")
+        buf = io.StringIO()
+        buf.write("import com.comsol.model.*;\n")
+        buf.write("import com.comsol.model.util.*;\n")
+        buf.write("\n")
+        buf.write(f"public class {config.get('model_name', 'GeneratedModel')} {{\n")
+        buf.write("    public static Model run() {\n")
+        buf.write("        Model model = ModelUtil.create(\"Model1\");\n")
+        buf.write("\n")
         
         # Add parameters
         if "parameters" in parameters:
-            java_code.append("        // Define parameters")
+            buf.write("        // Define parameters\n")
             for name, param in parameters.items():
                 if name != "parameters":  # Skip the parameters group
-                    java_code.append(f"        model.param().set(\"{name}\", \"{param.to_comsol_string()}\");")
+                    buf.write(f"        model.param().set(\"{name}\", \"{param.to_comsol_string()}\");\n")
                         
             # Handle nested parameters
             if "parameters" in parameters and isinstance(parameters["parameters"].value, dict):
                 for name, value in parameters["parameters"].value.items():
                     if isinstance(value, dict):
                         param_val = value.get("value", "")
-                        unit = value.get("unit", "")
-                        java_code.append(f"        model.param().set(\"{name}\", \"{param_val}\");")
+                        buf.write(f"        model.param().set(\"{name}\", \"{param_val}\");\n")
         
-        java_code.append("")
+        buf.write("\n")
         
         # Create geometry
-        java_code.extend(self._generate_geometry_code(parameters, config))
+        self._generate_geometry_code(buf, parameters, config)
         
         # Create mesh
-        java_code.extend(self._generate_mesh_code(parameters, config))
+        self._generate_mesh_code(buf, parameters, config)
         
         # Add physics
-        java_code.extend(self._generate_physics_code(parameters, config))
+        self._generate_physics_code(buf, parameters, config)
         
         # Add study
-        java_code.extend(self._generate_study_code(parameters, config))
+        self._generate_study_code(buf, parameters, config)
         
         # Add solver
-        java_code.extend(self._generate_solver_code(parameters, config))
+        self._generate_solver_code(buf, parameters, config)
         
-        java_code.append("")
-        java_code.append("        return model;")
-        java_code.append("    }")
-        java_code.append("}")
+        buf.write("\n")
+        buf.write("        return model;\n")
+        buf.write("    }\n")
+        buf.write("}")
         
-        return "\n".join(java_code)
+        return buf.getvalue()
     
-    def _generate_geometry_code(self, parameters: Dict[str, COMSOLParameter], 
-                              config: Dict[str, Any]) -> List[str]:
-        """Generate geometry creation code"""
-        code = []
-        
+    def _generate_geometry_code(self, buf: io.StringIO, parameters: Dict[str, COMSOLParameter], 
+                              config: Dict[str, Any]):
+        """Write geometry creation code"""
         geometry_config = config.get("geometry", {})
         geom_type = geometry_config.get("type", "rectangle")
         
-        code.append("        // Create geometry")
-        code.append("        model.component().create(\"comp1\", true);")
-        code.append("        model.component(\"comp1\").geom().create(\"geom1\", 3);  // 3D geometry")
-        
-        if geom_type == "rectangle":
-            dims = geometry_config.get("dimensions", [1, 1, 1])
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").create(\"blk1\", \"Block\");")
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").feature(\"blk1\").set(\"size\", {dims});")
-        elif geom_type == "cylinder":
-            radius = geometry_config.get("radius", 1.0)
-            height = geometry_config.get("height", 1.0)
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").create(\"cyl1\", \"Cylinder\");")
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").feature(\"cyl1\").set(\"r\", {radius});")
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").feature(\"cyl1\").set(\"h\", {height});")
-        elif geom_type == "sphere":
-            radius = geometry_config.get("radius", 1.0)
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").create(\"sph1\", \"Sphere\");")
-            code.append(f"        model.component(\"comp1\").geom(\"geom1\").feature(\"sph1\").set(\"r\", {radius});")
-        
-        code.append("        model.component(\"comp1\").geom(\"geom1\").run();")
-        code.append("")
-        
-        return code
-    
-    def _generate_mesh_code(self, parameters: Dict[str, COMSOLParameter], 
-                          config: Dict[str, Any]) -> List[str]:
-        """Generate mesh creation code"""
-        code = []
+        buf.write("        // Create geometry\n")
+        buf.write("        model.component().create(\"comp1\", true);\n")
+        buf.write("        model.component(\"comp1\").geom().create(\"geom1\", 3);  // 3D geometry\n")
+        
+        if geom_type in JAVA_GEOMETRY_TEMPLATES:
+            buf.write(JAVA_GEOMETRY_TEMPLATES[geom_type].format_map({
+                "dims": geometry_config.get("dimensions", [1, 1, 1]),
+                "radius": geometry_config.get("radius", 1.0),
+                "height": geometry_config.get("height", 1.0),
+            }))
         
+        buf.write("        model.component(\"comp1\").geom(\"geom1\").run();\n")
+        buf.write("\n")
+    
+    def _generate_mesh_code(self, buf: io.StringIO, parameters: Dict[str, COMSOLParameter], 
+                          config: Dict[str, Any]):
+        """Write mesh creation code"""
         mesh_config = config.get("mesh", {})
         element_size = mesh_config.get("element_size", "normal")
         
-        code.append("        // Create mesh")
-        code.append("        model.component(\"comp1\").mesh().create(\"mesh1\");")
-        
-        if element_size == "coarse":
-            code.append("        model.component(\"comp1\").mesh(\"mesh1\").automatic(true, \"coarse\");")
-        elif element_size == "fine":
-            code.append("        model.component(\"comp1\").mesh(\"mesh1\").automatic(true, \"fine\");")
-        elif element_size == "normal":
-            code.append("        model.component(\"comp1\").mesh(\"mesh1\").automatic(true);")
-        
-        code.append("")
-        return code
+        buf.write("        // Create mesh\n")
+        buf.write("        model.component(\"comp1\").mesh().create(\"mesh1\");\n")
+        buf.write(JAVA_MESH_TEMPLATES.get(element_size, ""))
+        buf.write("\n")
     
-    def _generate_physics_code(self, parameters: Dict[str, COMSOLParameter], 
-                             config: Dict[str, Any]) -> List[str]:
-        """Generate physics setup code"""
-        code = []
-        
+    def _generate_physics_code(self, buf: io.StringIO, parameters: Dict[str, COMSOLParameter], 
+                             config: Dict[str, Any]):
+        """Write physics setup code"""
         physics_list = config.get("physics", [])
         if isinstance(physics_list, str):
             physics_list = [physics_list]
         
-        code.append("        // Add physics")
-        
+        buf.write("        // Add physics\n")
         for physics in physics_list:
-            if physics == "electrostatics":
-                code.append("        model.component(\"comp1\").physics().create(\"es1\", \"Electrostatics\", \"geom1\");")
-                # Add boundary conditions
-                code.append("        model.component(\"comp1\").physics(\"es1\").create(\"pot1\", \"Pointwise\", 2);")
-                code.append("        model.component(\"comp1\").physics(\"es1\").feature(\"pot1\").selection().all();")
-            
-            elif physics == "heat_transfer":
-                code.append("        model.component(\"comp1\").physics().create(\"ht1\", \"HeatTransfer\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"ht1\").create(\"init1\", \"Init\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"ht1\").feature(\"init1\").selection().all();")
-            
-            elif physics == "fluid_flow":
-                code.append("        model.component(\"comp1\").physics().create(\"spf1\", \"LaminarFlow\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"spf1\").create(\"init1\", \"Init\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"spf1\").feature(\"init1\").selection().all();")
-            
-            elif physics == "structural_mechanics":
-                code.append("        model.component(\"comp1\").physics().create(\"solid1\", \"SolidMechanics\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"solid1\").create(\"fix1\", \"Fixed\", \"geom1\");")
-                code.append("        model.component(\"comp1\").physics(\"solid1\").feature(\"fix1\").selection().all();")
-        
-        code.append("")
-        return code
+            buf.write(PHYSICS_TEMPLATES.get(physics, ""))
+        buf.write("\n")
     
-    def _generate_study_code(self, parameters: Dict[str, COMSOLParameter], 
-                           config: Dict[str, Any]) -> List[str]:
-        """Generate study setup code"""
-        code = []
-        
+    def _generate_study_code(self, buf: io.StringIO, parameters: Dict[str, COMSOLParameter], 
+                           config: Dict[str, Any]):
+        """Write study setup code"""
         solver_config = config.get("solver", {})
         solver_type = solver_config.get("solver_type", "stationary")
         
-        code.append("        // Create study")
-        
-        if solver_type == "stationary":
-            code.append("        model.study().create(\"std1\");")
-            code.append("        model.study(\"std1\").create(\"stat\", \"Stationary\");")
-        elif solver_type == "time_dependent":
+        buf.write("        // Create study\n")
+        if solver_type in JAVA_STUDY_TEMPLATES:
             time_range = solver_config.get("time_range", [0, 1])
-            code.append("        model.study().create(\"std1\");")
-            code.append("        model.study(\"std1\").create(\"time\", \"Time\");")
-            code.append(f"        model.study(\"std1\").feature(\"time\").set(\"tlist\", \"range({time_range[0]}, 0.1, {time_range[1]})\")")
-        elif solver_type == "eigenfrequency":
-            code.append("        model.study().create(\"std1\");")
-            code.append("        model.study(\"std1\").create(\"eig\", \"Eigenfrequency\");")
-        
-        code.append("")
-        return code
+            buf.write(JAVA_STUDY_TEMPLATES[solver_type].format_map({
+                "t_start": time_range[0],
+                "t_end": time_range[1],
+            }))
+        buf.write("\n")
     
-    def _generate_solver_code(self, parameters: Dict[str, COMSOLParameter], 
-                            config: Dict[str, Any]) -> List[str]:
-        """Generate solver setup code"""
-        code = []
-        
+    def _generate_solver_code(self, buf: io.StringIO, parameters: Dict[str, COMSOLParameter], 
+                            config: Dict[str, Any]):
+        """Write solver setup code"""
         solver_config = config.get("solver", {})
         rel_tol = solver_config.get("relative_tolerance", 0.001)
         
-        code.append("        // Configure solver")
-        code.append("        model.sol().create(\"sol1\");")
-        code.append("        model.sol(\"sol1\").study(\"std1\");")
-        code.append(f"        model.sol(\"sol1\").feature(\"s1\").set(\"rtol\", {rel_tol});")
-        
-        code.append("")
-        return code
+        buf.write(JAVA_SOLVER_TEMPLATE.format_map({"rel_tol": rel_tol}))
     
     def generate_matlab_code(self, parameters: Dict[str, COMSOLParameter], 
                            config: Dict[str, Any]) -> str:
         """Generate MATLAB code for COMSOL API"""
-        matlab_code = []
-        matlab_code.append("% COMSOL Model Generation")
-        matlab_code.append("")
-        matlab_code.append("model = mphload('blank_model.mph'); % Load a blank model template")
-        matlab_code.append("")
+        buf = io.StringIO()
+        buf.write("% COMSOL Model Generation\n")
+        buf.write("\n")
+        buf.write("model = mphload('blank_model.mph'); % Load a blank model template\n")
+        buf.write("\n")
         
         # Add parameters
-        matlab_code.append("% Set parameters")
+        buf.write("% Set parameters\n")
         for name, param in parameters.items():
             if name != "parameters":
-                matlab_code.append(f"model.param.set('{name}', '{param.to_comsol_string()}');")
+                buf.write(f"model.param.set('{name}', '{param.to_comsol_string()}');\n")
         
         # Add nested parameters
         if "parameters" in parameters and isinstance(parameters["parameters"].value, dict):
             for name, value in parameters["parameters"].value.items():
                 if isinstance(value, dict):
                     param_val = value.get("value", "")
-                    matlab_code.append(f"model.param.set('{name}', '{param_val}');")
+                    buf.write(f"model.param.set('{name}', '{param_val}');\n")
         
-        matlab_code.append("")
+        buf.write("\n")
         
         # Build geometry
         geometry_config = config.get("geometry", {})
         geom_type = geometry_config.get("type", "rectangle")
-        matlab_code.append("% Build geometry")
-        
-        if geom_type == "rectangle":
-            dims = geometry_config.get("dimensions", [1, 1, 1])
-            matlab_code.append("model.component.create('comp1', true);")
-            matlab_code.append("model.component('comp1').geom.create('geom1', 3);")
-            matlab_code.append(f"model.component('comp1').geom('geom1').create('blk1', 'Block');")
-            matlab_code.append(f"model.component('comp1').geom('geom1').feature('blk1').set('size', [{dims[0]} {dims[1]} {dims[2]}]);")
-            matlab_code.append("model.component('comp1').geom('geom1').run;")
-        
-        matlab_code.append("")
-        matlab_code.append("% Build mesh")
-        matlab_code.append("model.component('comp1').mesh.create('mesh1');")
-        matlab_code.append("model.component('comp1').mesh('mesh1').run;")
-        matlab_code.append("")
+        buf.write("% Build geometry\n")
+        if geom_type in MATLAB_GEOMETRY_TEMPLATES:
+            buf.write(MATLAB_GEOMETRY_TEMPLATES[geom_type].format_map({
+                "dims": geometry_config.get("dimensions", [1, 1, 1]),
+            }))
+        
+        buf.write("\n")
+        buf.write("% Build mesh\n")
+        buf.write("model.component('comp1').mesh.create('mesh1');\n")
+        buf.write("model.component('comp1').mesh('mesh1').run;\n")
+        buf.write("\n")
         
         # Add physics
         physics_list = config.get("physics", [])
         if isinstance(physics_list, str):
             physics_list = [physics_list]
         
-        matlab_code.append("% Add physics")
+        buf.write("% Add physics\n")
         for physics in physics_list:
-            if physics == "electrostatics":
-                matlab_code.append("model.component('comp1').physics.create('es1', 'Electrostatics', 'geom1');")
+            buf.write(MATLAB_PHYSICS_TEMPLATES.get(physics, ""))
         
-        matlab_code.append("")
-        matlab_code.append("% Create study")
+        buf.write("\n")
+        buf.write("% Create study\n")
         solver_config = config.get("solver", {})
         solver_type = solver_config.get("solver_type", "stationary")
-        
-        if solver_type == "stationary":
-            matlab_code.append("model.study.create('std1');")
-            matlab_code.append("model.study('std1').create('stat', 'Stationary');")
-        
-        matlab_code.append("")
-        matlab_code.append("% Solve")
-        matlab_code.append("model.sol.create('sol1');")
-        matlab_code.append("model.sol('sol1').study('std1');")
-        matlab_code.append("model.sol('sol1').run;")
-        matlab_code.append("")
-        matlab_code.append("% Save model")
+        buf.write(MATLAB_STUDY_TEMPLATES.get(solver_type, ""))
+        
+        buf.write("\n")
+        buf.write("% Solve\n")
+        buf.write("model.sol.create('sol1');\n")
+        buf.write("model.sol('sol1').study('std1');\n")
+        buf.write("model.sol('sol1').run;\n")
+        buf.write("\n")
+        buf.write("% Save model\n")
         model_name = config.get("model_name", "generated_model")
-        matlab_code.append(f"mphsave(model, '{model_name}.mph');")
+        buf.write(f"mphsave(model, '{model_name}.mph');")
         
-        return "\n".join(matlab_code)
+        return buf.getvalue()
 
 
 def main():
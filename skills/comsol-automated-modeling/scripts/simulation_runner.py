@@ -4,62 +4,136 @@ COMSOL Simulation Executor
 Handles running COMSOL simulations and post-processing results
 """
 
+import hashlib
 import json
+import mmap
+import multiprocessing.util
 import os
+import pickle
 import sys
 import subprocess
+import tempfile
+import warnings
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import mph
+except ImportError:
+    mph = None
+
 
 class COMSOLSimulationRunner:
     """Executes COMSOL simulations and manages the workflow"""
     
-    def __init__(self, comsol_path: str = None):
-        self.comsol_path = comsol_path or self._find_comsol()
+    def __init__(self, comsol_path: str = None, use_server: bool = True, drop_output_cache: bool = False):
+        self.comsol_path = comsol_path or _find_comsol()
+        # Resolved once rather than on every batch job
+        self._comsol_executable = _comsol_executable(self.comsol_path) if self.comsol_path else None
         self.results = {}
+        # Persistent COMSOL session (via mph), started on first use; batch mode is the fallback
+        self.use_server = use_server and mph is not None
+        self._client = None
+        # Evict result files from the page cache once read (for long sweeps and I/O profiling)
+        self.drop_output_cache = drop_output_cache and hasattr(os, 'posix_fadvise')
         
-    def _find_comsol(self) -> str:
-        """Try to find COMSOL installation path"""
-        # Common COMSOL installation paths
-        common_paths = [
-            "/Applications/COMSOL/COMSOL56/Multiphysics",  # macOS
-            "/usr/local/comsol56/multiphysics",  # Linux
-            "C:/Program Files/COMSOL/COMSOL56/Multiphysics",  # Windows
-        ]
-        
-        for path in common_paths:
-            if os.path.exists(path):
-                return path
-        
-        # Try environment variable
-        comsol_env = os.environ.get('COMSOL_PATH')
-        if comsol_env and os.path.exists(comsol_env):
-            return comsol_env
-        
-        return None
-    
     def run_batch_simulation(self, model_file: str, output_dir: str = "results") -> Dict[str, Any]:
-        """Run a simulation in batch mode"""
-        if not self.comsol_path:
+        """Run a simulation on the persistent COMSOL server, or in batch mode as a fallback"""
+        client = self._ensure_server()
+        if client is None and not self.comsol_path:
             raise RuntimeError("COMSOL installation not found. Please set COMSOL_PATH environment variable.")
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # Generate batch command
-        batch_script = self._create_batch_script(model_file, output_dir)
-        
-        # Execute simulation
-        result = self._execute_batch_job(batch_script)
+        if client is not None:
+            self._solve_on_server(client, model_file, output_dir)
+        else:
+            # Generate batch command
+            batch_script = self._create_batch_script(model_file, output_dir)
+            
+            # Execute simulation
+            result = self._execute_batch_job(batch_script, output_dir)
+            if result.returncode != 0:
+                raise RuntimeError(f"COMSOL batch job failed with return code {result.returncode}")
         
         # Process results
         self.results = self._process_results(output_dir)
         
         return self.results
     
+    def _ensure_server(self):
+        """Start the COMSOL server once and return its client, or None to use batch mode"""
+        if not self.use_server:
+            return None
+        
+        if self._client is None:
+            try:
+                # mph launches an mphserver child process and waits until it accepts connections
+                print("Starting persistent COMSOL server")
+                self._client = mph.start()
+            except Exception as e:
+                print(f"Could not start COMSOL server, falling back to batch mode: {e}")
+                self.use_server = False
+                return None
+        
+        return self._client
+    
+    def close(self):
+        """Disconnect from the COMSOL server, if one was started"""
+        if self._client is not None:
+            try:
+                self._client.disconnect()
+            except Exception as e:
+                print(f"Failed to close COMSOL connection: {e}")
+            self._client = None
+    
+    def _solve_on_server(self, client, model_file: str, output_dir: str):
+        """Solve a model and export its results on the live COMSOL server"""
+        model = client.load(model_file)
+        try:
+            java = model.java
+            
+            # Solve
+            java.sol('sol1').runAll()
+            
+            # Export solution data
+            export = java.result().export('data1')
+            export.set('data', 'dset1')
+            export.set('filename', os.path.join(output_dir, 'solution_data.txt'))
+            export.set('type', 'txt')
+            export.run()
+            
+            # Export mesh if available
+            if 'mesh1' in [str(tag) for tag in java.mesh().tags()]:
+                java.mesh('mesh1').export(os.path.join(output_dir, 'mesh_data.mphtxt'))
+            
+            # Save model with results
+            model.save(os.path.join(output_dir, 'solved_model.mph'))
+        finally:
+            client.remove(model)
+    
     def _create_batch_script(self, model_file: str, output_dir: str) -> str:
-        """Create a batch script for COMSOL"""
+        """Create the batch script text for COMSOL"""
         script_content = f"""
         # COMSOL Batch Script
         # Generated automatically by COMSOL automation skill
@@ -89,42 +163,43 @@ class COMSOLSimulationRunner:
         exit;
         """
         
-        script_file = "batch_script.m"
-        with open(script_file, 'w') as f:
-            f.write(script_content)
-        
-        return script_file
+        return script_content
     
-    def _execute_batch_job(self, script_file: str) -> subprocess.CompletedProcess:
-        """Execute the COMSOL batch job"""
+    def _execute_batch_job(self, script: str, output_dir: str) -> subprocess.CompletedProcess:
+        """Execute the COMSOL batch job for the given script text"""
         if not self.comsol_path:
             raise RuntimeError("COMSOL installation not found")
         
-        # COMSOL command line options
-        mpiexec = os.path.join(self.comsol_path, "bin", "mpiexec")
-        comsol = os.path.join(self.comsol_path, "bin", "comsol")
+        comsol = self._comsol_executable
         
-        # For different platforms
-        if sys.platform.startswith('win'):
-            mpiexec += ".exe"
-            comsol += ".bat"
+        # comsol batch only reads scripts from a path, so the script lives in a uniquely
+        # named temporary file for the duration of the job
+        with tempfile.NamedTemporaryFile('w', suffix='.m', dir=output_dir, delete=False) as f:
+            f.write(script)
+            script_file = f.name
         
-        # Build command
-        cmd = [comsol, "batch", "-inputfile", script_file]
+        # Build command; per-job log and temp dirs keep parallel jobs from contending on shared files
+        cmd = [comsol, "batch", "-inputfile", script_file,
+               "-batchlog", os.path.join(output_dir, "batch.log"),
+               "-tmpdir", os.path.join(output_dir, "tmp")]
         
         print(f"Executing command: {' '.join(cmd)}")
         
+        # Output goes straight to a log file rather than being buffered in memory
+        log_path = os.path.join(output_dir, "comsol.log")
+        
         try:
-            result = subprocess.run(cmd, 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=3600)  # 1 hour timeout
+            with open(log_path, 'wb') as log_file:
+                result = subprocess.run(cmd, 
+                                      stdout=log_file, 
+                                      stderr=subprocess.STDOUT, 
+                                      timeout=3600)  # 1 hour timeout
             
             if result.returncode == 0:
                 print("Simulation completed successfully")
             else:
                 print(f"Simulation failed with return code: {result.returncode}")
-                print(f"Error output: {result.stderr}")
+                print(f"Error output (end of {log_path}): {_tail(log_path)}")
             
             return result
             
@@ -134,6 +209,8 @@ class COMSOLSimulationRunner:
         except Exception as e:
             print(f"Error running simulation: {e}")
             raise
+        finally:
+            os.unlink(script_file)
     
     def _process_results(self, results_dir: str) -> Dict[str, Any]:
         """Process simulation results"""
@@ -145,76 +222,286 @@ class COMSOLSimulationRunner:
         }
         
         # Check what files were generated
-        for file in os.listdir(results_dir):
-            file_path = os.path.join(results_dir, file)
-            results["files_generated"].append(file)
+        with os.scandir(results_dir) as entries:
+            for entry in entries:
+                file = entry.name
+                file_path = entry.path
+                results["files_generated"].append(file)
             
-            if file.endswith(".txt"):
-                try:
-                    with open(file_path, 'r') as f:
-                        data = f.read()
-                        results["solution_data"] = data[:1000]  # First 1000 chars
+                if file.endswith(".txt"):
+                    try:
+                        # Map the file instead of reading it; only the preview is decoded
+                        with open(file_path, 'rb') as f:
+                            if os.fstat(f.fileno()).st_size == 0:
+                                preview, line_count = "", 0
+                            else:
+                                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                                    preview = mm[:1000].decode('utf-8', errors='replace')  # First 1000 bytes
+                                    line_count = _count_lines(mm)
+                            if self.drop_output_cache:
+                                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                        results["solution_data"] = preview
                         
-                    # Basic statistics
-                    lines = data.strip().split('\n')
-                    results["summary"]["data_points"] = len(lines)
+                        # Basic statistics
+                        results["summary"]["data_points"] = line_count
                     
-                except Exception as e:
-                    results["summary"][f"error_reading_{file}"] = str(e)
+                    except Exception as e:
+                        results["summary"][f"error_reading_{file}"] = str(e)
         
         return results
     
     def run_parameter_sweep(self, base_config: str, parameter: str, 
-                          values: List[float], output_dir: str = "parameter_sweep") -> Dict[str, Any]:
-        """Run parameter sweep simulation"""
-        os.makedirs(output_dir, exist_ok=True)
+                          values: List[float], output_dir: str = "parameter_sweep",
+                          max_workers: Optional[int] = None, parametric: bool = True,
+                          summary_format: str = "json") -> Dict[str, Any]:
+        """Run parameter sweep simulation
+        
+        Every value gets its own sweep directory and config, and finished values are served
+        from the cache. By default the remaining values run as one COMSOL parametric sweep,
+        reusing the loaded model and mesh. With parametric=False (e.g. value-dependent geometry) each value is a separate
+        COMSOL job, run in a process pool of max_workers processes (SWEEP_MAX_WORKERS by
+        default). summary_format is one of SUMMARY_FORMATS.
+        """
+        # Checked before any COMSOL job starts, not when the summary is written
+        summary_format = _resolve_summary_format(summary_format)
+        
+        # Absolute paths so worker processes never depend on the current directory
+        output_dir = os.path.abspath(output_dir)
+        # Created once here; per-point directories below need only a single mkdir each
+        base = Path(output_dir)
+        base.mkdir(parents=True, exist_ok=True)
+        
+        with open(base_config, 'r') as f:
+            config = json.load(f)
+        
+        if "parameters" not in config:
+            config["parameters"] = {}
         
-        results = []
+        # Results are cached by content hash, so resumed or extended sweeps skip finished points
+        cache_dir = base / ".cache"
+        cache_dir.mkdir(exist_ok=True)
         
+        # First pass: write each sweep point's config and model, serving finished points from the cache
+        results = [None] * len(values)
+        jobs = {}
         for i, value in enumerate(values):
-            print(f"Running parameter sweep {i+1}/{len(values)}: {parameter} = {value}")
+            sweep_dir = base / f"sweep_{i}"
+            sweep_dir.mkdir(exist_ok=True)
             
-            # Create modified config
-            sweep_dir = os.path.join(output_dir, f"sweep_{i}")
-            os.makedirs(sweep_dir, exist_ok=True)
-            
-            # Update parameter in config
-            with open(base_config, 'r') as f:
-                config = json.load(f)
-            
-            if "parameters" not in config:
-                config["parameters"] = {}
-            
-            config["parameters"][parameter] = value
+            # Update parameter in a copy of the config
+            point_config = {**config, "parameters": {**config["parameters"], parameter: value}}
             
             # Save modified config
             sweep_config = os.path.join(sweep_dir, "config.json")
             with open(sweep_config, 'w') as f:
-                json.dump(config, f, indent=2)
+                json.dump(point_config, f, indent=2)
             
-            # Generate model and run simulation
+            # Generate model
             model_file = self._generate_model_from_config(sweep_config, sweep_dir)
             
-            try:
-                single_result = self.run_batch_simulation(model_file, sweep_dir)
-                results.append({
+            cache_file = os.path.join(cache_dir, f"{_sweep_cache_key(model_file, point_config)}.json")
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r') as f:
+                    cached_result = json.load(f)
+                print(f"Using cached result for parameter sweep {i+1}: {parameter} = {value}")
+                results[i] = {
                     "parameter": parameter,
                     "value": value,
-                    "result": single_result
-                })
+                    "result": cached_result
+                }
+                continue
+            
+            jobs[i] = (model_file, sweep_dir, cache_file)
+        
+        # Second pass: run the missing points. Each point this run computes is appended to the
+        # progress log as it finishes; the log starts fresh per run, and cached points stay
+        # in the cache rather than being repeated there
+        with open(os.path.join(output_dir, SWEEP_PROGRESS_FILE), 'wb') as progress:
+            if parametric and len(jobs) > 1:
+                self._run_parametric_sweep(config, parameter, values, jobs, results, output_dir, progress)
+            elif jobs:
+                self._run_sweep_pool(parameter, values, jobs, results, max_workers, progress)
+        
+        return self._write_sweep_summary(results, output_dir, summary_format)
+    
+    def _run_sweep_pool(self, parameter: str, values: List[float], jobs: Dict[int, tuple],
+                        results: List[Optional[Dict[str, Any]]], max_workers: Optional[int], progress):
+        """Run each missing sweep point as its own COMSOL job; the jobs are independent, so run them concurrently"""
+        with ProcessPoolExecutor(max_workers=max_workers or SWEEP_MAX_WORKERS, initializer=_init_sweep_worker,
+                                 initargs=(self.comsol_path, self.use_server, self.drop_output_cache)) as executor:
+            futures = {
+                executor.submit(_run_sweep_point, model_file, sweep_dir): i
+                for i, (model_file, sweep_dir, _) in jobs.items()
+            }
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                value = values[i]
+                try:
+                    single_result = future.result()
+                    results[i] = {
+                        "parameter": parameter,
+                        "value": value,
+                        "result": single_result
+                    }
+                    print(f"Completed parameter sweep {done}/{len(jobs)}: {parameter} = {value}")
+                    
+                    # Only successful runs are cached
+                    with open(jobs[i][2], 'w') as f:
+                        json.dump(single_result, f, indent=2)
+                    
+                except Exception as e:
+                    print(f"Error in parameter sweep {i+1}: {e}")
+                    results[i] = {
+                        "parameter": parameter,
+                        "value": value,
+                        "error": str(e)
+                    }
                 
-            except Exception as e:
-                print(f"Error in parameter sweep {i+1}: {e}")
-                results.append({
+                _append_progress(progress, results[i])
+    
+    def _run_parametric_sweep(self, config: Dict[str, Any], parameter: str, values: List[float],
+                              jobs: Dict[int, tuple], results: List[Optional[Dict[str, Any]]],
+                              output_dir: str, progress):
+        """Run the missing sweep points as a single COMSOL parametric sweep job"""
+        indices = sorted(jobs)
+        sweep_values = [values[i] for i in indices]
+        sweep_dirs = [jobs[i][1] for i in indices]
+        
+        # Only this job's exports may count as results
+        for sweep_dir in sweep_dirs:
+            (sweep_dir / 'solution_data.txt').unlink(missing_ok=True)
+        
+        # One model from the base config; the sweep itself varies the global parameter
+        sweep_config = os.path.join(output_dir, "config.json")
+        with open(sweep_config, 'w') as f:
+            json.dump(config, f, indent=2)
+        model_file = self._generate_model_from_config(sweep_config, output_dir)
+        
+        print(f"Running parametric sweep of {parameter} over {len(sweep_values)} values in one COMSOL job")
+        error = None
+        try:
+            client = self._ensure_server()
+            if client is None and not self.comsol_path:
+                raise RuntimeError("COMSOL installation not found. Please set COMSOL_PATH environment variable.")
+            
+            if client is not None:
+                self._solve_parametric_on_server(client, model_file, parameter, sweep_values, sweep_dirs, output_dir)
+            else:
+                batch_script = self._create_parametric_script(model_file, parameter, sweep_values, sweep_dirs, output_dir)
+                result = self._execute_batch_job(batch_script, output_dir)
+                if result.returncode != 0:
+                    raise RuntimeError(f"COMSOL batch job failed with return code {result.returncode}")
+        except Exception as e:
+            print(f"Error in parametric sweep: {e}")
+            error = str(e)
+        
+        # A value succeeded if its solution was exported, even when the job failed afterwards
+        for i, sweep_dir in zip(indices, sweep_dirs):
+            value = values[i]
+            if (sweep_dir / 'solution_data.txt').exists():
+                point_result = self._process_results(sweep_dir)
+                results[i] = {
+                    "parameter": parameter,
+                    "value": value,
+                    "result": point_result
+                }
+                
+                # Only successful points are cached
+                with open(jobs[i][2], 'w') as f:
+                    json.dump(point_result, f, indent=2)
+            else:
+                results[i] = {
                     "parameter": parameter,
                     "value": value,
-                    "error": str(e)
-                })
+                    "error": error or "No solution exported for this value"
+                }
+            
+            _append_progress(progress, results[i])
+    
+    def _solve_parametric_on_server(self, client, model_file: str, parameter: str, values: List[float],
+                                    sweep_dirs: List[Path], output_dir: str):
+        """Run a parametric sweep on the live COMSOL server and export one solution per value"""
+        model = client.load(model_file)
+        try:
+            java = model.java
+            
+            # Configure and run the parametric sweep
+            study = java.study('std1')
+            if not study.feature().has('param'):
+                study.create('param', 'Parametric')
+            study.feature('param').setIndex('pname', parameter, 0)
+            study.feature('param').setIndex('plistarr', _format_plist(values), 0)
+            study.run()
+            
+            # Export each parameter value's solution into its own sweep directory
+            export = java.result().export('data1')
+            export.set('data', 'dset1')
+            export.set('type', 'txt')
+            export.set('looplevelinput', 'manual')
+            for i, sweep_dir in enumerate(sweep_dirs):
+                export.set('looplevel', [str(i + 1)])
+                export.set('filename', os.path.join(sweep_dir, 'solution_data.txt'))
+                export.run()
+            
+            # Save model with all results
+            model.save(os.path.join(output_dir, 'solved_model.mph'))
+        finally:
+            client.remove(model)
+    
+    def _create_parametric_script(self, model_file: str, parameter: str, values: List[float],
+                                  sweep_dirs: List[Path], output_dir: str) -> str:
+        """Create the batch script text running all values as one parametric sweep"""
+        exports = "".join(f"""
+        model.result().export('data1').set('looplevel', {{'{i + 1}'}});
+        model.result().export('data1').set('filename', '{sweep_dir}/solution_data.txt');
+        model.result().export('data1').run();
+        """ for i, sweep_dir in enumerate(sweep_dirs))
+        
+        script_content = f"""
+        # COMSOL Parametric Sweep Batch Script
+        # Generated automatically by COMSOL automation skill
         
-        # Save summary
-        summary_file = os.path.join(output_dir, "parameter_sweep_summary.json")
-        with open(summary_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        # Load the model
+        model = mphload('{model_file}')
+        
+        # Configure the parametric sweep
+        if ~model.study('std1').feature().has('param')
+            model.study('std1').create('param', 'Parametric');
+        end
+        model.study('std1').feature('param').setIndex('pname', '{parameter}', 0);
+        model.study('std1').feature('param').setIndex('plistarr', '{_format_plist(values)}', 0);
+        
+        # Solve all parameter values in one study run
+        model.study('std1').run();
+        
+        # Export one solution file per parameter value
+        model.result().export('data1').set('data', 'dset1');
+        model.result().export('data1').set('type', 'txt');
+        model.result().export('data1').set('looplevelinput', 'manual');
+        {exports}
+        # Save model with results
+        mphsave(model, '{output_dir}/solved_model.mph');
+        
+        # Exit
+        exit;
+        """
+        
+        return script_content
+    
+    def _write_sweep_summary(self, results: List[Dict[str, Any]], output_dir: str,
+                             summary_format: str = "json") -> Dict[str, Any]:
+        """Save the sweep summary file in a format returned by _resolve_summary_format"""
+        summary_file = os.path.join(output_dir, f"parameter_sweep_summary{SUMMARY_FORMATS[summary_format]}")
+        if summary_format == "msgpack":
+            data = msgpack.packb(results)
+        elif summary_format == "pickle+zstd":
+            data = zstandard.ZstdCompressor().compress(pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            data = json.dumps(results, indent=2).encode('utf-8')
+        
+        with open(summary_file, 'wb') as f:
+            f.write(data)
         
         return {"sweep_results": results, "summary_file": summary_file}
     
@@ -225,80 +512,298 @@ class COMSOLSimulationRunner:
         return os.path.join(output_dir, "generated_model.mph")
 
 
+@lru_cache(maxsize=1)
+def _find_comsol() -> Optional[str]:
+    """Try to find COMSOL installation path (probed once per process)"""
+    # Common COMSOL installation paths
+    common_paths = [
+        "/Applications/COMSOL/COMSOL56/Multiphysics",  # macOS
+        "/usr/local/comsol56/multiphysics",  # Linux
+        "C:/Program Files/COMSOL/COMSOL56/Multiphysics",  # Windows
+    ]
+    
+    for path in common_paths:
+        if os.path.exists(path):
+            return path
+    
+    # Try environment variable
+    comsol_env = os.environ.get('COMSOL_PATH')
+    if comsol_env and os.path.exists(comsol_env):
+        return comsol_env
+    
+    return None
+
+
+def _comsol_executable(comsol_path: str) -> str:
+    """Path of the comsol launcher for this platform"""
+    comsol = os.path.join(comsol_path, "bin", "comsol")
+    if sys.platform.startswith('win'):
+        comsol += ".bat"
+    return comsol
+
+
+def _tail(path: str, size: int = 4096) -> str:
+    """Last few KB of a text file"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.fstat(f.fileno()).st_size - size))
+        return f.read().decode('utf-8', errors='replace')
+
+
+def _listing_row(entry: os.DirEntry) -> tuple:
+    """(name, size, mtime_ns) of a directory entry; size and mtime are None for non-files"""
+    if entry.is_file():
+        stat = entry.stat()
+        return entry.name, stat.st_size, stat.st_mtime_ns
+    return entry.name, None, None
+
+
+def _append_progress(progress, entry: Dict[str, Any]):
+    """Append one sweep result as a line of NDJSON and flush it to disk"""
+    if orjson is not None:
+        progress.write(orjson.dumps(entry) + b'\n')
+    else:
+        progress.write(json.dumps(entry).encode('utf-8') + b'\n')
+    progress.flush()
+
+
+def _format_plist(values: List[float]) -> str:
+    """Format sweep values as a COMSOL parameter value list"""
+    return " ".join(str(value) for value in values)
+
+
+def _resolve_summary_format(summary_format: str) -> str:
+    """Validate a sweep summary format, falling back to JSON when its package is not installed"""
+    if summary_format not in SUMMARY_FORMATS:
+        raise ValueError(f"Unknown summary format {summary_format!r}; expected one of {list(SUMMARY_FORMATS)}")
+    
+    # Binary formats need optional packages; JSON is always available
+    if (summary_format == "msgpack" and msgpack is None) or \
+            (summary_format == "pickle+zstd" and zstandard is None):
+        print(f"{summary_format} support not installed, writing JSON summary instead")
+        return "json"
+    return summary_format
+
+
+def _sweep_cache_key(model_file: str, config: Dict[str, Any]) -> str:
+    """Content hash of a sweep point's model file and full config (solver settings and parameters)"""
+    digest = hashlib.sha256()
+    # Models not generated yet (placeholder paths) are keyed on the config alone
+    if os.path.exists(model_file):
+        with open(model_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    digest.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Sweep summary formats and their file extensions
+SUMMARY_FORMATS = {"json": ".json", "msgpack": ".msgpack", "pickle+zstd": ".pkl.zst"}
+
+# Points computed by the current sweep run are appended here as they finish (rewritten per run);
+# the summary with every point is written at the end
+SWEEP_PROGRESS_FILE = "parameter_sweep_progress.ndjson"
+
+# Default sweep pool size; every worker runs its own COMSOL server (a JVM and a license seat)
+SWEEP_MAX_WORKERS = 2
+
+# Thread pool used for per-file stats when a results directory has many entries
+REPORT_IO_WORKERS = 8
+REPORT_PARALLEL_STAT_MIN = 32
+
+# Slice size used when counting lines in a mapped file
+COUNT_CHUNK_SIZE = 1 << 20
+
+# Buffer size for sequential solution-file reads (default 8 KiB means many small reads)
+READ_BUFFER_SIZE = 1 << 20
+
+# Lines handed to NumPy at a time when computing solution statistics
+STATS_BLOCK_LINES = 1 << 16
+
+
+def _count_lines(mm: mmap.mmap) -> int:
+    """Count lines in a mapped file, ignoring leading and trailing whitespace (blank lines inside count)"""
+    end = len(mm)
+    while end and mm[end - 1:end].isspace():
+        end -= 1
+    if not end:
+        return 0
+    start = 0
+    while mm[start:start + 1].isspace():
+        start += 1
+    # Count in fixed-size slices; mmap.count() only exists on Python 3.13+
+    newlines = sum(mm[i:min(i + COUNT_CHUNK_SIZE, end)].count(b'\n')
+                   for i in range(start, end, COUNT_CHUNK_SIZE))
+    return newlines + 1
+
+
+def _parse_numeric_block(lines: List[str]) -> np.ndarray:
+    """Parse tab-separated lines into a 2-D float array, with NaN for non-numeric fields (ValueError if ragged)"""
+    # Only whole lines starting with % are COMSOL comments; a % inside a field makes it non-numeric
+    lines = [line for line in lines if not line.startswith('%')]
+    with warnings.catch_warnings():
+        # Empty blocks and skipped ragged lines only produce warnings
+        warnings.simplefilter('ignore')
+        try:
+            # Fast C parser for purely numeric data
+            return np.loadtxt(lines, delimiter='\t', comments=None, ndmin=2)
+        except ValueError:
+            # genfromtxt would silently skip ragged rows and report stats from the rest
+            if len({line.count('\t') for line in lines}) > 1:
+                raise ValueError("rows have different numbers of columns")
+            # genfromtxt only accepts ndmin from NumPy 1.23; a 1-D result here is a single row
+            return np.atleast_2d(np.genfromtxt(lines, delimiter='\t', comments=None))
+
+
+# Per-process runner used by sweep pool workers, so each keeps one COMSOL server for all its jobs
+_worker_runner = None
+
+
+def _init_sweep_worker(comsol_path: Optional[str], use_server: bool, drop_output_cache: bool):
+    """Pool initializer: create this worker's runner"""
+    global _worker_runner
+    _worker_runner = COMSOLSimulationRunner(comsol_path, use_server, drop_output_cache)
+    # Worker processes exit without running atexit hooks; shut the COMSOL client down on exit
+    multiprocessing.util.Finalize(None, _worker_runner.close, exitpriority=10)
+
+
+def _run_sweep_point(model_file: str, sweep_dir: Path) -> Dict[str, Any]:
+    """Run one sweep point in a worker process"""
+    return _worker_runner.run_batch_simulation(model_file, sweep_dir)
+
+
 class ResultProcessor:
     """Process and analyze simulation results"""
     
     def __init__(self, results_dir: str):
         self.results_dir = results_dir
+        # Reports keyed by the directory's (name, size, mtime) signature
+        self._report_cache: Dict[tuple, str] = {}
+    
+    def clear_cache(self):
+        """Forget memoized reports"""
+        self._report_cache.clear()
     
     def generate_summary_report(self) -> str:
-        """Generate a summary report of simulation results"""
+        """Generate a summary report of simulation results, reusing it while the directory is unchanged"""
+        # One directory scan gives both the cache signature and the file listing;
+        # scandir gets the file type from the directory read, so only files need a stat
+        with os.scandir(self.results_dir) as scan:
+            entries = list(scan)
+        
+        # Stats are I/O-bound, so large (e.g. networked) directories stat files in parallel
+        if len(entries) >= REPORT_PARALLEL_STAT_MIN:
+            with ThreadPoolExecutor(max_workers=REPORT_IO_WORKERS) as executor:
+                listing = list(executor.map(_listing_row, entries))
+        else:
+            listing = [_listing_row(entry) for entry in entries]
+        
+        signature = tuple(sorted(listing, key=lambda item: item[0]))
+        report_text = self._report_cache.get(signature)
+        if report_text is None:
+            report_text = self._build_summary_report(listing)
+            self._report_cache[signature] = report_text
+        return report_text
+    
+    def _build_summary_report(self, listing: List[tuple]) -> str:
+        """Build the summary report from a directory listing"""
         report = []
         report.append("# COMSOL Simulation Results Report")
         report.append("")
         
-        # List all result files
+        # List all result files, picking the first solution data file in the same pass
         report.append("## Generated Files")
-        files = os.listdir(self.results_dir)
-        for file in files:
-            file_path = os.path.join(self.results_dir, file)
-            if os.path.isfile(file_path):
-                size = os.path.getsize(file_path)
-                report.append(f"- {file} ({size:,} bytes)")
+        solution_file = None
+        for name, size, _ in listing:
+            if size is not None:
+                report.append(f"- {name} ({size:,} bytes)")
+            if solution_file is None and "solution" in name and name.endswith(".txt"):
+                solution_file = name
         
         report.append("")
         
         # Try to parse solution data
-        solution_file = None
-        for file in files:
-            if "solution" in file and file.endswith(".txt"):
-                solution_file = file
-                break
-        
         if solution_file:
             report.append("## Solution Data Summary")
             try:
-                with open(os.path.join(self.results_dir, solution_file), 'r') as f:
-                    data = f.read()
-                
-                lines = data.strip().split('\n')
-                report.append(f"- Total data points: {len(lines)}")
+                # Single streaming pass: line count and preview in Python, numeric
+                # parsing and per-column stats in NumPy one block of lines at a time.
+                # The count spans the first to the last non-blank line, as _count_lines does
+                line_no = 0
+                first_line = last_line = 0
+                preview = []
+                tab_separated = None
+                block = []
+                stats = None  # per-column count, min, max and sum arrays
+                stats_error = False
                 
-                # Try to extract numerical data for statistics
-                if lines and '\t' in lines[0]:  # Tab-separated data
+                def add_block():
+                    nonlocal stats, stats_error
                     try:
-                        # Parse numerical columns
-                        numeric_lines = []
-                        for line in lines:
-                            parts = line.split('\t')
-                            numeric_parts = []
-                            for part in parts:
-                                try:
-                                    numeric_parts.append(float(part.strip()))
-                                except ValueError:
-                                    numeric_parts.append(float('nan'))
-                            if any(not (x != x) for x in numeric_parts):  # Check for non-NaN
-                                numeric_lines.append(numeric_parts)
+                        arr = _parse_numeric_block(block)
+                    except ValueError:
+                        stats_error = True
+                        return
+                    finally:
+                        block.clear()
+                    if arr.size == 0:
+                        return
+                    if stats is None:
+                        width = arr.shape[1]
+                        stats = [np.zeros(width, dtype=np.int64), np.full(width, np.nan),
+                                 np.full(width, np.nan), np.zeros(width)]
+                    elif arr.shape[1] != len(stats[0]):
+                        stats_error = True
+                        return
+                    # fmin/fmax ignore NaN, so missing values drop out of every statistic
+                    stats[0] += (~np.isnan(arr)).sum(axis=0)
+                    stats[1] = np.fmin(stats[1], np.fmin.reduce(arr, axis=0))
+                    stats[2] = np.fmax(stats[2], np.fmax.reduce(arr, axis=0))
+                    stats[3] += np.nansum(arr, axis=0)
+                
+                with open(os.path.join(self.results_dir, solution_file), 'r', buffering=READ_BUFFER_SIZE) as f:
+                    for line in f:
+                        line_no += 1
+                        line = line.rstrip('\r\n')
+                        blank = not line.strip()
+                        if not blank:
+                            if not first_line:
+                                first_line = line_no
+                            last_line = line_no
+                        # Preview is the first 10 lines from the first non-blank one
+                        if first_line and line_no < first_line + 10:
+                            preview.append(line)
+                        if blank:
+                            continue
                         
-                        if numeric_lines:
-                            import statistics
-                            num_cols = len(numeric_lines[0])
-                            
-                            for col in range(num_cols):
-                                col_data = [line[col] for line in numeric_lines if line[col] == line[col]]  # Filter NaN
-                                if col_data:
-                                    report.append(f"- Column {col+1}: min={min(col_data):.4e}, max={max(col_data):.4e}, mean={statistics.mean(col_data):.4e}")
-                    except Exception:
-                        report.append("- Unable to parse numerical statistics")
+                        if tab_separated is None:
+                            tab_separated = '\t' in line  # Tab-separated data
+                        if tab_separated and not stats_error:
+                            block.append(line)
+                            if len(block) >= STATS_BLOCK_LINES:
+                                add_block()
+                    
+                    if block and not stats_error:
+                        add_block()
+                
+                data_points = last_line - first_line + 1 if first_line else 0
+                del preview[data_points:]  # trailing blank lines
+                report.append(f"- Total data points: {data_points}")
+                
+                if stats_error:
+                    report.append("- Unable to parse numerical statistics")
+                elif stats is not None:
+                    counts, mins, maxs, sums = stats
+                    for col in np.flatnonzero(counts):
+                        report.append(f"- Column {col+1}: min={mins[col]:.4e}, max={maxs[col]:.4e}, mean={sums[col] / counts[col]:.4e}")
                 
                 # Preview data
                 report.append("")
                 report.append("### Data Preview (first 10 lines)")
-                for i, line in enumerate(lines[:10]):
+                for i, line in enumerate(preview):
                     report.append(f"```")
                     report.append(line)
                     report.append(f"```")
-                    if i < min(9, len(lines)-1):
+                    if i < len(preview) - 1:
                         report.append("")
                 
             except Exception as e:
@@ -352,11 +857,28 @@ def main():
         print("Usage: python3 simulation_runner.py <command> [args...]")
         print("  Commands:")
         print("    batch <model_file> [output_dir]")
-        print("    sweep <config_file> <parameter> <values_file> [output_dir]")
+        print("    sweep <config_file> <parameter> <values_file> [output_dir] [max_workers] [--per-value]")
+        print("          [--summary-format=json|msgpack|pickle+zstd]")
         print("    summary <results_dir>")
         print("    sample")
         return
     
+    # --per-value runs each sweep value as its own COMSOL job instead of one parametric sweep
+    per_value = "--per-value" in sys.argv
+    if per_value:
+        sys.argv.remove("--per-value")
+    
+    summary_format = "json"
+    for arg in sys.argv[2:]:
+        if arg.startswith("--summary-format="):
+            summary_format = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+    try:
+        summary_format = _resolve_summary_format(summary_format)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    
     command = sys.argv[1]
     
     if command == "sample":
@@ -365,51 +887,57 @@ def main():
     
     runner = COMSOLSimulationRunner()
     
-    if command == "batch":
-        if len(sys.argv) < 3:
-            print("Usage: python3 simulation_runner.py batch <model_file> [output_dir]")
-            return
+    try:
+        if command == "batch":
+            if len(sys.argv) < 3:
+                print("Usage: python3 simulation_runner.py batch <model_file> [output_dir]")
+                return
         
-        model_file = sys.argv[2]
-        output_dir = sys.argv[3] if len(sys.argv) > 3 else "results"
+            model_file = sys.argv[2]
+            output_dir = sys.argv[3] if len(sys.argv) > 3 else "results"
         
-        try:
-            results = runner.run_batch_simulation(model_file, output_dir)
-            print("Simulation completed. Results:")
-            print(f"  Files generated: {results['files_generated']}")
-            print(f"  Data points: {results['summary'].get('data_points', 'N/A')}")
-        except Exception as e:
-            print(f"Error: {e}")
-    
-    elif command == "sweep":
-        if len(sys.argv) < 5:
-            print("Usage: python3 simulation_runner.py sweep <config_file> <parameter> <values_file> [output_dir]")
-            return
+            try:
+                results = runner.run_batch_simulation(model_file, output_dir)
+                print("Simulation completed. Results:")
+                print(f"  Files generated: {results['files_generated']}")
+                print(f"  Data points: {results['summary'].get('data_points', 'N/A')}")
+            except Exception as e:
+                print(f"Error: {e}")
         
-        config_file = sys.argv[2]
-        parameter = sys.argv[3]
-        values_file = sys.argv[4]
-        output_dir = sys.argv[5] if len(sys.argv) > 5 else "parameter_sweep"
+        elif command == "sweep":
+            if len(sys.argv) < 5:
+                print("Usage: python3 simulation_runner.py sweep <config_file> <parameter> <values_file> [output_dir] [max_workers] [--per-value]")
+                return
         
-        # Load parameter values
-        with open(values_file, 'r') as f:
-            values = json.load(f)
+            config_file = sys.argv[2]
+            parameter = sys.argv[3]
+            values_file = sys.argv[4]
+            output_dir = sys.argv[5] if len(sys.argv) > 5 else "parameter_sweep"
+            max_workers = int(sys.argv[6]) if len(sys.argv) > 6 else None
         
-        try:
-            results = runner.run_parameter_sweep(config_file, parameter, values, output_dir)
-            print(f"Parameter sweep completed. Summary saved to: {results['summary_file']}")
-        except Exception as e:
-            print(f"Error: {e}")
-    
-    elif command == "summary":
-        if len(sys.argv) < 3:
-            print("Usage: python3 simulation_runner.py summary <results_dir>")
-            return
-        
-        results_dir = sys.argv[2]
-        processor = ResultProcessor(results_dir)
-        report = processor.generate_summary_report()
-        print(report)
+            # Load parameter values
+            data = Path(values_file).read_bytes()
+            values = orjson.loads(data) if orjson is not None else json.loads(data)
+        
+            try:
+                results = runner.run_parameter_sweep(config_file, parameter, values, output_dir, max_workers,
+                                                     parametric=not per_value, summary_format=summary_format)
+                print(f"Parameter sweep completed. Summary saved to: {results['summary_file']}")
+            except Exception as e:
+                print(f"Error: {e}")
+        
+        elif command == "summary":
+            if len(sys.argv) < 3:
+                print("Usage: python3 simulation_runner.py summary <results_dir>")
+                return
+        
+            results_dir = sys.argv[2]
+            processor = ResultProcessor(results_dir)
+            report = processor.generate_summary_report()
+            print(report)
+    finally:
+        # Shut down the persistent COMSOL session, if one was started
+        runner.close()
 
 
 if __name__ == "__main__":